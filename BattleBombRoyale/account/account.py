@@ -1,54 +1,105 @@
-from iconservice import *
-from ..utils.utils import *
-
-TAG = 'BattleBombRoyale'
-
-class InvalidAccountName(Exception):
-    pass
-
-class Account:
-    # ================================================
-    #  Constants
-    # ================================================
-    _NAME_MIN_CHARACTERS = 3
-    _NAME_MAX_CHARACTERS = 12
-
-    # ================================================
-    def __init__(self, address: str, name: str):
-        self._address = address
-        self._name = name
-
-    # States ==================
-    def set_name(self, name: str):
-        self._check_valid_name(name)
-        self._name = name
-
-    # Serialization ==================
-    def serialize(self) -> dict:
-        return {
-            'address' : self._address,
-            'name' : self._name
-        }
-
-    @staticmethod
-    def deserialize(obj: dict) -> 'Account':
-        return Account(
-            address=obj['address'],
-            name=obj['name']
-        )
-
-    def to_json(self) -> str:
-        return json_dumps(self.serialize())
-
-    @staticmethod
-    def from_json(json: str) -> 'Account':
-        return Account.deserialize(json_loads(json))
-
-    # Checks ===========================
-    def _check_valid_name(self, name: str) -> None:
-        if (len(name) < self._NAME_MIN_CHARACTERS
-                or len(name) > self._NAME_MAX_CHARACTERS
-                or not Utils.is_ascii(name)):
-            raise InvalidAccountName
-
-    # Getters ==================
+from iconservice import *
+from ..utils.utils import *
+
+TAG = 'BattleBombRoyale'
+
+class InvalidAccountName(Exception):
+    pass
+
+class Account:
+    # ================================================
+    #  Constants
+    # ================================================
+    _NAME_MIN_CHARACTERS = 3
+    _NAME_MAX_CHARACTERS = 12
+
+    # ================================================
+    def __init__(self,
+                 address: str,
+                 name: str,
+                 games_played: int = 0,
+                 wins: int = 0,
+                 loots: int = 0,
+                 icx_won: int = 0):
+        self._address = address
+        self._name = name
+        self._games_played = games_played
+        self._wins = wins
+        self._loots = loots
+        # ICX won with victories and loots
+        self._icx_won = icx_won
+        # Dirty is the set of fields modified since the account has been stored
+        self._dirty = set()
+
+    # States ==================
+    def set_name(self, name: str):
+        self._check_valid_name(name)
+        self._name = name
+        self._dirty.add('name')
+
+    def add_game_played(self) -> None:
+        self._games_played += 1
+        self._dirty.add('games_played')
+
+    def add_win(self, reward: int) -> None:
+        self._wins += 1
+        self._icx_won += reward
+        self._dirty.update(['wins', 'icx_won'])
+
+    def add_loot(self, reward: int) -> None:
+        self._loots += 1
+        self._icx_won += reward
+        self._dirty.update(['loots', 'icx_won'])
+
+    # Dirty tracking ==================
+    def is_dirty(self, field: str = None) -> bool:
+        return field in self._dirty if field else bool(self._dirty)
+
+    def clear_dirty(self) -> None:
+        self._dirty = set()
+
+    # Serialization ==================
+    def serialize(self) -> dict:
+        return {
+            'address' : self._address,
+            'name' : self._name,
+            'games_played' : self._games_played,
+            'wins' : self._wins,
+            'loots' : self._loots,
+            'icx_won' : self._icx_won
+        }
+
+    @staticmethod
+    def deserialize(obj: dict) -> 'Account':
+        return Account(
+            address=obj['address'],
+            name=obj['name'],
+            # Accounts created by a previous deployment have no counters
+            games_played=obj.get('games_played', 0),
+            wins=obj.get('wins', 0),
+            loots=obj.get('loots', 0),
+            icx_won=obj.get('icx_won', 0)
+        )
+
+    def to_json(self) -> str:
+        return json_dumps(self.serialize())
+
+    @staticmethod
+    def from_json(json: str) -> 'Account':
+        return Account.deserialize(json_loads(json))
+
+    # Checks ===========================
+    def _check_valid_name(self, name: str) -> None:
+        if (len(name) < self._NAME_MIN_CHARACTERS
+                or len(name) > self._NAME_MAX_CHARACTERS
+                or not Utils.is_ascii(name)):
+            raise InvalidAccountName
+
+    # Getters ==================
+    @property
+    def address(self) -> str:
+        return self._address
+
+    @property
+    def icx_won(self) -> int:
+        return self._icx_won
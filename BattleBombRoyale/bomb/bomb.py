@@ -1,5 +1,6 @@
 from iconservice import *
 from ..utils.utils import *
+from ..codec.codec import *
 
 TAG = 'BattleBombRoyale'
 
@@ -19,9 +20,13 @@ class Bomb:
     # For each pass to another player, the bomb chance of explosion increase
     _BOMB_EXPLOSION_TICK = 5
 
+    __slots__ = ['_started', '_risk', '_dirty']
+
     def __init__(self, started: int, risk: int = None):
         self._started = started
         self._risk = risk if risk else self._BOMB_RISK_INITIAL_CAP
+        # Dirty is set if the bomb has been modified since it has been stored
+        self._dirty = False
 
     # States ==================
     def afk_timeout(self, now: int) -> bool:
@@ -35,9 +40,18 @@ class Bomb:
         self._risk += self._BOMB_EXPLOSION_TICK
         if self._risk > self._BOMB_RISK_MAXIMUM_CAP:
             self._risk = self._BOMB_RISK_MAXIMUM_CAP
+        self._dirty = True
 
     def afk_reset(self, started: int) -> None:
         self._started = started
+        self._dirty = True
+
+    # Dirty tracking ==================
+    def is_dirty(self) -> bool:
+        return self._dirty
+
+    def clear_dirty(self) -> None:
+        self._dirty = False
 
     # Serialization ==================
     def serialize(self) -> dict:
@@ -53,6 +67,17 @@ class Bomb:
             risk=obj['risk']
         )
 
+    def write(self, writer: BinaryWriter) -> None:
+        writer.write_varint(self._started)
+        writer.write_varint(self._risk)
+
+    @staticmethod
+    def read(reader: BinaryReader) -> 'Bomb':
+        return Bomb(
+            started=reader.read_varint(),
+            risk=reader.read_varint()
+        )
+
     # Checks ===========================
     def check_not_afk_timeout(self, now: int) -> None:
         if self.afk_timeout(now):
@@ -0,0 +1,128 @@
+# ================================================
+#  Exceptions
+# ================================================
+class InvalidEncoding(Exception):
+    pass
+
+class UnsupportedCodecVersion(Exception):
+    pass
+
+class Codec:
+    # ================================================
+    #  Constants
+    # ================================================
+    # Version of the binary layout, written as the first byte of each record.
+    # JSON records always start with '{', which is never a valid version
+    VERSION = 1
+    # Records written with an older version are still readable
+    _MINIMUM_VERSION = 1
+    _JSON_PREFIX = b'{'
+    # Address prefixes, stored as the first byte of a 21 bytes address
+    _ADDRESS_PREFIXES = ['hx', 'cx']
+    _ADDRESS_BODY_SIZE = 20
+    # Transaction hashes are 32 bytes long
+    _HASH_SIZE = 32
+
+    @staticmethod
+    def is_json(data: bytes) -> bool:
+        return data[:1] == Codec._JSON_PREFIX
+
+    @staticmethod
+    def is_outdated(data: bytes) -> bool:
+        """ Check if a record needs to be rewritten with the current layout """
+        return Codec.is_json(data) or data[0] != Codec.VERSION
+
+    @staticmethod
+    def check_version(version: int) -> None:
+        if not Codec._MINIMUM_VERSION <= version <= Codec.VERSION:
+            raise UnsupportedCodecVersion
+
+class PlayerFlags:
+    # Binary layout : the state of a player and its shield, readiness
+    # and bomb ownership are packed in a single byte, by the player
+    # records and after each address of the roster of a game header
+    STATE_MASK = 0b00011
+    SHIELD     = 0b00100
+    READY      = 0b01000
+    BOMB       = 0b10000
+
+class BinaryWriter:
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._buffer.append(Codec.VERSION)
+
+    def write_byte(self, value: int) -> None:
+        self._buffer.append(value)
+
+    def write_varint(self, value: int) -> None:
+        """ Unsigned LEB128 : 7 bits per byte, high bit set if more bytes follow """
+        if value < 0:
+            raise InvalidEncoding
+        while value > 0x7f:
+            self._buffer.append((value & 0x7f) | 0x80)
+            value >>= 7
+        self._buffer.append(value)
+
+    def write_address(self, address: str) -> None:
+        prefix = address[:2]
+        if prefix not in Codec._ADDRESS_PREFIXES:
+            raise InvalidEncoding
+        self._buffer.append(Codec._ADDRESS_PREFIXES.index(prefix))
+        self._write_fixed(bytes.fromhex(address[2:]), Codec._ADDRESS_BODY_SIZE)
+
+    def write_hash(self, value: str) -> None:
+        self._write_fixed(bytes.fromhex(value), Codec._HASH_SIZE)
+
+    def _write_fixed(self, value: bytes, size: int) -> None:
+        if len(value) != size:
+            raise InvalidEncoding
+        self._buffer.extend(value)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self._buffer)
+
+class BinaryReader:
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._offset = 0
+        self._version = self.read_byte()
+        Codec.check_version(self._version)
+
+    def read_byte(self) -> int:
+        if self._offset >= len(self._data):
+            raise InvalidEncoding
+        value = self._data[self._offset]
+        self._offset += 1
+        return value
+
+    def read_varint(self) -> int:
+        value = 0
+        shift = 0
+        while True:
+            byte = self.read_byte()
+            value |= (byte & 0x7f) << shift
+            if not byte & 0x80:
+                return value
+            shift += 7
+
+    def read_address(self) -> str:
+        prefix = self.read_byte()
+        if prefix >= len(Codec._ADDRESS_PREFIXES):
+            raise InvalidEncoding
+        return Codec._ADDRESS_PREFIXES[prefix] + self._read_fixed(Codec._ADDRESS_BODY_SIZE).hex()
+
+    def read_hash(self) -> str:
+        return self._read_fixed(Codec._HASH_SIZE).hex()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _read_fixed(self, size: int) -> bytes:
+        if self._offset + size > len(self._data):
+            raise InvalidEncoding
+        value = self._data[self._offset:self._offset + size]
+        self._offset += size
+        return value
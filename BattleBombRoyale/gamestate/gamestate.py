@@ -2,6 +2,8 @@ from iconservice import *
 from ..player.player import *
 from ..bomb.bomb import *
 from ..utils.utils import *
+from ..codec.codec import *
+from ..roster.roster import *
 
 TAG = 'BattleBombRoyale'
 
@@ -62,6 +64,19 @@ class DoNotSuicide(Exception):
 class GameIsFull(Exception):
     pass
 
+class InvalidRoyaleSettings(Exception):
+    pass
+
+
+# ================================================
+#  Constants
+# ================================================
+class GameStatus:
+    LOBBY = 'lobby'
+    COUNTDOWN = 'countdown'
+    RUNNING = 'running'
+    ALL = [LOBBY, COUNTDOWN, RUNNING]
+
 class GameState:
 
     # ================================================
@@ -71,8 +86,19 @@ class GameState:
     _MINIMUM_PLAYERS_START_GAME = 2
     # Seconds required for the start countdown for each player
     _START_COUNTDOWN_DURATION_PER_PLAYER = 5 * 1000 * 1000
+    # Maximum duration of the start countdown : only reached by royale
+    # games, so an AFK player can't block a game for more than 2 minutes
+    _MAXIMUM_START_COUNTDOWN_DURATION = 120 * 1000 * 1000
     # Maximum players per game
     _MAXIMUM_PLAYERS_IN_GAME = 10
+    # Players allowed in a royale game : games larger than a classic
+    # game store their roster in the state DB instead of their header
+    _MINIMUM_ROYALE_PLAYERS = 100
+    _MAXIMUM_ROYALE_PLAYERS = 500
+    # A royale game may have one bomb for each 10 players
+    _ROYALE_PLAYERS_PER_BOMB = 10
+    # Global statistics a game contributes to
+    STATISTICS = ['games', 'lobbies', 'players', 'escrow']
 
     def __init__(self,
                  token: str,
@@ -83,26 +109,58 @@ class GameState:
                  players: dict = None,
                  events: list = None,
                  reward: int = 0,
-                 ready_timestamp: int = 0):
+                 ready_timestamp: int = 0,
+                 version: int = 0,
+                 max_players: int = None,
+                 bombs: int = 1,
+                 roster: Roster = None,
+                 player_loader=None):
         self._cost = cost
         self._token = token
         self._host = host
         self._created = created
         self._started = started
-        # Players is a dict with player address as a key
+        # Players is a dict with player address as a key.
+        # A player set to None isn't loaded yet, the player loader
+        # is called with its address the first time it is accessed
         self._players = players if players else {}
-        # Events is a list of hashes containing eventlogs
+        self._player_loader = player_loader
+        self._max_players = max_players if max_players else self._MAXIMUM_PLAYERS_IN_GAME
+        # Number of bombs in game while enough players are alive
+        self._bombs = bombs
+        # Roster indexes the player addresses by state, bomb and readiness.
+        # If it isn't known, it is built from the players the first time
+        # it is accessed. Players is then only a cache of the loaded players
+        self._roster = roster
+        if roster is None and not self._players:
+            self._roster = Roster.in_memory()
+        # Events is a list of hashes containing eventlogs,
+        # not yet appended to the game events in the statedb
         self._events = events if events else []
         self._reward = reward
         self._ready_timestamp = ready_timestamp
+        # Version is incremented each time the gamestate is written
+        self._version = version
+        # Dirty is the set of header fields modified since the gamestate has been stored
+        self._dirty = set()
+        # Removed is an ordered set of the addresses of the players
+        # removed from the game since the gamestate has been stored
+        self._removed = {}
 
     # ================================================
     #  Checks
     # ================================================
     def check_game_not_full(self) -> None:
-        if self._players_count() >= self._MAXIMUM_PLAYERS_IN_GAME:
+        if self._players_count() >= self._max_players:
             raise GameIsFull
 
+    @staticmethod
+    def check_royale_settings(max_players: int, bombs: int) -> None:
+        if not GameState._MINIMUM_ROYALE_PLAYERS <= max_players <= GameState._MAXIMUM_ROYALE_PLAYERS:
+            raise InvalidRoyaleSettings
+        if not 1 <= bombs <= max_players // GameState._ROYALE_PLAYERS_PER_BOMB:
+            raise InvalidRoyaleSettings
+
     def check_players_count(self) -> None:
         if self._players_count() < self._MINIMUM_PLAYERS_START_GAME:
             raise NotEnoughPlayers
@@ -136,11 +194,11 @@ class GameState:
             raise PlayerIsNotWinner
 
     def check_address_is_player(self, player_address: str) -> None:
-        if not player_address in self._players:
+        if not self.has_player(player_address):
             raise PlayerNotFound
 
     def check_address_not_in_game(self, player_address: str) -> None:
-        if player_address in self._players:
+        if self.has_player(player_address):
             raise GameAlreadyJoined
 
     def check_enough_reward(self, amount: int) -> None:
@@ -155,8 +213,8 @@ class GameState:
         if not self.is_started():
             raise GameNotStarted
 
-    def check_enough_players_without_bomb(self, players_without_bomb: list):
-        if not players_without_bomb:
+    def check_enough_players_without_bomb(self, count: int):
+        if count <= 0:
             # Not enough players are hands free
             raise CannotDistributeBombs
 
@@ -174,51 +232,83 @@ class GameState:
     def _send_bomb_failure(self, player: Player) -> None:
         # Sorry player, but you're gonna die.
         player.prepare_to_die()
+        self._update_player_state(player)
+
+    def _get_roster(self) -> Roster:
+        if self._roster is None:
+            roster = Roster.in_memory()
+            for player in map(self._load_player, list(self._players.keys())):
+                roster.add(player.address, player.state, player.has_bomb(), player.is_ready())
+            self._roster = roster
+        return self._roster
+
+    def _set_roster_dirty(self) -> None:
+        # The roster of a royale game is stored in the state DB, not in the header
+        if not self.is_royale():
+            self._dirty.add('roster_flags')
+
+    def _update_player_state(self, player: Player) -> None:
+        self._get_roster().set_state(player.address, player.state)
+        self._set_roster_dirty()
+
+    def _set_ready(self, player: Player) -> None:
+        player.set_ready()
+        self._get_roster().set_ready(player.address)
+        self._set_roster_dirty()
 
     def _send_bomb_success(self, player: Player, receiver: Player, now: int) -> None:
         # Update the bomb instance
-        bomb = player.remove_bomb()
+        bomb = self._remove_bomb(player)
         bomb.afk_reset(now)
         bomb.tick()
         # Enjoy your bomb, receiver
-        receiver.give_bomb(bomb)
-
-    def _get_all_players_without_bomb(self, immune: Player) -> list:
-        # Only pick players without bombs in hand
-        # Conditions list :
-        # - Player be must alive
-        # - Player must not already hold a bomb
-        # - The player must not be immune
-        return list(filter(
-            lambda player:
-            player.is_alive() and
-            not player.has_bomb() and
-            (player != immune if immune else True),
-            self.get_all_players()))
+        self._give_bomb(receiver, bomb)
+
+    def _give_bomb(self, player: Player, bomb: Bomb) -> None:
+        player.give_bomb(bomb)
+        self._get_roster().set_bomb(player.address, True)
+        self._set_roster_dirty()
+
+    def _remove_bomb(self, player: Player) -> Bomb:
+        bomb = player.remove_bomb()
+        self._get_roster().set_bomb(player.address, False)
+        self._set_roster_dirty()
+        return bomb
 
     def _get_random_player_without_bomb(self, immune: Player = None) -> Player:
-        players_without_bomb = self._get_all_players_without_bomb(immune)
-        self.check_enough_players_without_bomb(players_without_bomb)
-        # Pick one player randomly
-        return Utils.rand_pick(players_without_bomb)
+        # Only players alive without bombs in hand are receivers
+        receivers = self._get_roster().get_receivers()
+        # The immune player can't be picked
+        immune_position = None
+        if immune and immune.address in receivers:
+            immune_position = receivers.index(immune.address)
+        count = len(receivers) - (1 if immune_position is not None else 0)
+        self.check_enough_players_without_bomb(count)
+
+        # Pick one player randomly, the last receiver takes
+        # the place of the immune player. Only the picked player is loaded
+        position = Utils.rand(0, count)
+        if position == immune_position:
+            position = len(receivers) - 1
+        return self._load_player(receivers.get(position))
 
     def _change_host(self, leaver: Player) -> None:
-        # Get all players, except the leaver
-        players = list(filter(lambda player: player != leaver, self.get_all_players()))
-        # Pick a new host randomly
-        random_player = Utils.rand_pick(players)
-        self._host = random_player.address
+        # Pick a new host randomly, the leaver already left the roster
+        roster = self._get_roster()
+        self._host = roster.get_member(Utils.rand(0, roster.count()))
+        self._dirty.add('host')
 
     def is_victory(self) -> bool:
         # 1 alive, everybody else is dead
-        return (len(self.get_players_alive()) == 1
-                and len(self.get_players_dead()) == (len(self.get_all_players()) - 1))
+        roster = self._get_roster()
+        return (roster.count(PlayerState.ALIVE) == 1
+                and roster.count(PlayerState.DEAD) == (roster.count() - 1))
 
     def get_winner(self) -> Player:
-        return self.get_players_alive()[0]
+        return self._load_player(self._get_roster().get_first(PlayerState.ALIVE))
 
     def _players_count(self) -> int:
-        return len(self._players)
+        return self._get_roster().count()
 
     def get_participation_cost(self) -> int:
         return self._cost
@@ -234,7 +324,14 @@ class GameState:
         # Pick a random player without a bomb, create one and give it to him
         random_player_without_bomb = self._get_random_player_without_bomb()
         bomb = Bomb(started)
-        random_player_without_bomb.give_bomb(bomb)
+        self._give_bomb(random_player_without_bomb, bomb)
+
+    def _spawn_bombs(self, started: int) -> None:
+        # Keep all the bombs of the game in play, but at least
+        # one player alive must stay without a bomb
+        roster = self._get_roster()
+        while roster.count_bomb_holders() < min(self._bombs, roster.count(PlayerState.ALIVE) - 1):
+            self._spawn_new_bomb(started)
 
     # ================================================
     #  Extern methods
@@ -249,6 +346,11 @@ class GameState:
         # ==========================
         # Process
         self._players[player.address] = player
+        self._removed.pop(player.address, None)
+        self._get_roster().add(player.address, player.state, player.has_bomb(), player.is_ready())
+        self._dirty.add('roster')
+        # The player isn't stored yet
+        player.set_dirty()
 
     def quit(self, leaver: Player) -> None:
         # ==========================
@@ -257,7 +359,10 @@ class GameState:
 
         # ==========================
         # Process
-        del self._players[leaver.address]
+        self._players.pop(leaver.address, None)
+        self._removed[leaver.address] = True
+        self._get_roster().remove(leaver.address)
+        self._dirty.add('roster')
 
         # If none is left, game over
         if self._players_count() == 0:
@@ -280,9 +385,11 @@ class GameState:
         # ==========================
         # Process
         # Register now the ready timestamp
-        self._ready_timestamp = now + (self._players_count() * self._START_COUNTDOWN_DURATION_PER_PLAYER)
+        duration = self._players_count() * self._START_COUNTDOWN_DURATION_PER_PLAYER
+        self._ready_timestamp = now + min(duration, self._MAXIMUM_START_COUNTDOWN_DURATION)
+        self._dirty.add('ready_timestamp')
         # Check host as ready
-        host.set_ready()
+        self._set_ready(host)
 
     def ready_ok(self, player: Player) -> None:
         # ==========================
@@ -292,7 +399,7 @@ class GameState:
 
         # ==========================
         # Process
-        player.set_ready()
+        self._set_ready(player)
 
     def start(self, started: int) -> list:
         # ==========================
@@ -311,8 +418,9 @@ class GameState:
 
         # ==========================
         # Process
-        self._spawn_new_bomb(started)
+        self._spawn_bombs(started)
         self._started = started
+        self._dirty.add('started')
 
         return afkers
 
@@ -321,6 +429,7 @@ class GameState:
         # Check
         self.check_game_over()
         self._token = None
+        self._dirty.add('token')
 
     def send_bomb(self, player: Player, now: int, use_shield: bool) -> Player:
         # ==========================
@@ -348,7 +457,14 @@ class GameState:
 
     def get_player(self, address: str) -> Player:
         self.check_address_is_player(address)
-        return self._players[address]
+        return self._load_player(address)
+
+    def _load_player(self, address: str) -> Player:
+        player = self._players.get(address)
+        if player is None:
+            player = self._player_loader(address)
+            self._players[address] = player
+        return player
 
     def loot_player(self, looter: Player, looted: Player, now: int) -> None:
         # ==========================
@@ -357,41 +473,55 @@ class GameState:
         # ==========================
         # Finish him!
         looted.die(now)
-        looted.remove_bomb()
+        self._update_player_state(looted)
+        self._remove_bomb(looted)
 
         # Transfer a new bomb to someone else if the game is not over
         if not self.is_victory():
-            self._spawn_new_bomb(now)
+            self._spawn_bombs(now)
 
     def get_not_ready_players(self) -> list:
-        return list(filter(lambda player: not player.is_ready(), self.get_all_players()))
+        return list(map(self._load_player, self._get_roster().get_not_ready()))
+
+    def _get_players_by_state(self, state: int) -> list:
+        return list(map(self._load_player, self._get_roster().get_addresses(state)))
 
     def get_players_alive(self) -> list:
-        return list(filter(lambda player: player.is_alive(), self.get_all_players()))
+        return self._get_players_by_state(PlayerState.ALIVE)
 
     def get_players_lootable(self) -> list:
-        return list(filter(lambda player: player.is_lootable(), self.get_all_players()))
+        # Players with an AFK bomb are alive until looted
+        return self._get_players_by_state(PlayerState.LOOTABLE)
 
     def get_players_dead(self) -> list:
-        return list(filter(lambda player: player.is_dead(), self.get_all_players()))
+        return self._get_players_by_state(PlayerState.DEAD)
 
-    def get_player_with_bomb(self) -> Player:
-        for player in self.get_all_players():
-            if player.has_bomb():
-                return player
+    def get_players_with_bomb(self) -> list:
+        return list(map(self._load_player, self._get_roster().get_bomb_holders()))
 
     def get_all_players(self) -> list:
-        return self._players.values()
+        return [self._load_player(address) for address in self.get_all_addresses()]
+
+    def _get_loaded_players(self) -> list:
+        return list(filter(lambda player: player is not None, self._players.values()))
+
+    def get_all_addresses(self) -> list:
+        return self._get_roster().get_addresses()
+
+    def has_player(self, address: str) -> bool:
+        return address in self._get_roster()
 
     def deposit_reward(self, amount) -> None:
         self.check_participation_cost(amount)
         self._reward += amount
+        self._dirty.add('reward')
 
     def withdraw_reward(self, amount) -> None:
         # ==========================
         # Reward Checks
         self.check_enough_reward(amount)
         self._reward -= amount
+        self._dirty.add('reward')
 
     def remaining_reward(self) -> int:
         return self._reward
@@ -407,15 +537,79 @@ class GameState:
     def is_started(self) -> bool:
         return self._started != 0
 
+    def get_statistics(self) -> dict:
+        """ Contribution of the game to the global statistics """
+        if self.is_over():
+            return dict.fromkeys(self.STATISTICS, 0)
+        return {
+            'games' : 1,
+            'lobbies' : 0 if self.is_started() else 1,
+            'players' : self._players_count(),
+            'escrow' : self._reward
+        }
+
     def is_over(self) -> bool:
         return self._token is None
 
+    def get_status(self) -> str:
+        """ Status of the game, or None if the game is over """
+        if self.is_over():
+            return None
+        if self.is_started():
+            return GameStatus.RUNNING
+        if self._ready_timestamp != 0:
+            return GameStatus.COUNTDOWN
+        return GameStatus.LOBBY
+
+    def is_joinable(self) -> bool:
+        return (not self.is_over()
+                and not self.is_started()
+                and self._players_count() < self._max_players)
+
+    def is_royale(self) -> bool:
+        return GameState._is_royale_size(self._max_players)
+
+    @staticmethod
+    def _is_royale_size(max_players: int) -> bool:
+        return max_players > GameState._MAXIMUM_PLAYERS_IN_GAME
+
     def add_event(self, transaction: str) -> None:
         # Multiple events can be triggered in the same transaction
         # We don't need to add the transaction hash multiple times in the game event list.
         if not transaction in self._events:
             self._events.append(transaction)
 
+    def pop_new_events(self) -> list:
+        events = self._events
+        self._events = []
+        return events
+
+    # Versioning ==================
+    def increment_version(self) -> None:
+        self._version += 1
+        self._dirty.add('version')
+
+    # Dirty tracking ==================
+    def set_dirty(self) -> None:
+        self._dirty = {'token', 'host', 'started', 'roster', 'roster_flags', 'reward', 'ready_timestamp', 'version'}
+
+    def is_dirty(self, field: str = None) -> bool:
+        """ Check if a header field, or any header field if none is given, has been modified """
+        return field in self._dirty if field else bool(self._dirty)
+
+    def get_dirty_players(self) -> list:
+        # Players not loaded cannot be modified
+        return list(filter(lambda player: player.is_dirty(), self._get_loaded_players()))
+
+    def get_removed_addresses(self) -> list:
+        return list(self._removed.keys())
+
+    def clear_dirty(self) -> None:
+        self._dirty = set()
+        self._removed = {}
+        for player in self._get_loaded_players():
+            player.clear_dirty()
+
     # Serialization ==================
     def serialize(self) -> dict:
         return {
@@ -424,10 +618,12 @@ class GameState:
             'host' : self._host,
             'created' : self._created,
             'started' : self._started,
-            'players' : {k: v.serialize() for k, v in self._players.items()},
+            'players' : {player.address: player.serialize() for player in self.get_all_players()},
             'reward' : self._reward,
-            'events' : self._events,
-            'ready_timestamp' : self._ready_timestamp
+            'ready_timestamp' : self._ready_timestamp,
+            'version' : self._version,
+            'max_players' : self._max_players,
+            'bombs' : self._bombs
         }
 
     @staticmethod
@@ -440,10 +636,176 @@ class GameState:
             started=obj['started'],
             players={k: Player.deserialize(v) for k, v in obj['players'].items()},
             reward=obj['reward'],
-            events=obj['events'],
-            ready_timestamp=obj['ready_timestamp']
+            # Events were only stored with the gamestate by a previous deployment
+            events=obj.get('events'),
+            ready_timestamp=obj['ready_timestamp'],
+            version=obj.get('version', 0),
+            max_players=obj.get('max_players'),
+            bombs=obj.get('bombs', 1)
         )
 
+    def serialize_header(self) -> dict:
+        # The header only contains the player addresses,
+        # players are stored separately
+        return {
+            'token' : self._token,
+            'cost' : self._cost,
+            'host' : self._host,
+            'created' : self._created,
+            'started' : self._started,
+            'roster' : self.get_all_addresses(),
+            'reward' : self._reward,
+            'ready_timestamp' : self._ready_timestamp,
+            'version' : self._version,
+            'max_players' : self._max_players,
+            'bombs' : self._bombs
+        }
+
+    @staticmethod
+    def deserialize_header(obj: dict, player_loader, roster: Roster = None) -> 'GameState':
+        """ Players are loaded on demand by calling player_loader with their address.
+            The roster of a royale game isn't in its header and must be given """
+        if roster is None:
+            roster = GameState._roster_from_header(obj)
+        return GameState(
+            token=obj['token'],
+            cost=obj['cost'],
+            host=obj['host'],
+            created=obj['created'],
+            started=obj['started'],
+            players={address: None for address in obj.get('roster', [])},
+            reward=obj['reward'],
+            ready_timestamp=obj['ready_timestamp'],
+            version=obj['version'],
+            max_players=obj['max_players'],
+            bombs=obj['bombs'],
+            roster=roster,
+            player_loader=player_loader
+        )
+
+    @staticmethod
+    def _roster_from_header(obj: dict) -> Roster:
+        roster = Roster.in_memory()
+        bomb_holders = set(obj['bomb_holders'])
+        ready = set(obj['ready'])
+        for address, state in zip(obj['roster'], obj['states']):
+            roster.add(address, state, address in bomb_holders, address in ready)
+        return roster
+
+    @staticmethod
+    def is_royale_header(header: dict) -> bool:
+        return GameState._is_royale_size(header.get('max_players', GameState._MAXIMUM_PLAYERS_IN_GAME))
+
+    def encode_header(self) -> bytes:
+        writer = BinaryWriter()
+        writer.write_hash(self._token)
+        writer.write_varint(self._cost)
+        writer.write_address(self._host)
+        writer.write_varint(self._created)
+        writer.write_varint(self._started)
+        writer.write_varint(self._reward)
+        writer.write_varint(self._ready_timestamp)
+        writer.write_varint(self._max_players)
+        writer.write_varint(self._bombs)
+        roster = self._get_roster()
+        writer.write_varint(roster.count())
+        # Only the players count of a royale game is in its header
+        if not self.is_royale():
+            for address in roster.get_addresses():
+                writer.write_address(address)
+                flags = roster.get_state(address)
+                if roster.has_bomb(address):
+                    flags |= PlayerFlags.BOMB
+                if roster.is_ready(address):
+                    flags |= PlayerFlags.READY
+                writer.write_byte(flags)
+        writer.write_varint(self._version)
+        return writer.to_bytes()
+
+    @staticmethod
+    def decode_header(data: bytes) -> dict:
+        """ Decode a binary header, using the serialize_header layout.
+            A JSON record is a full gamestate written by a previous deployment """
+        if Codec.is_json(data):
+            return json_loads(data.decode())
+
+        reader = BinaryReader(data)
+        header = {
+            'token' : reader.read_hash(),
+            'cost' : reader.read_varint(),
+            'host' : reader.read_address(),
+            'created' : reader.read_varint(),
+            'started' : reader.read_varint(),
+            'reward' : reader.read_varint(),
+            'ready_timestamp' : reader.read_varint(),
+            'max_players' : reader.read_varint(),
+            'bombs' : reader.read_varint()
+        }
+        players_count = reader.read_varint()
+        if GameState.is_royale_header(header):
+            # The roster of a royale game is stored in the state DB
+            header['players_count'] = players_count
+        else:
+            header.update(GameState._decode_roster(reader, players_count))
+        header['version'] = reader.read_varint()
+        return header
+
+    @staticmethod
+    def _decode_roster(reader: BinaryReader, players_count: int) -> dict:
+        roster = {'roster' : [], 'states' : [], 'bomb_holders' : [], 'ready' : []}
+        for _ in range(players_count):
+            address = reader.read_address()
+            roster['roster'].append(address)
+            flags = reader.read_byte()
+            roster['states'].append(flags & PlayerFlags.STATE_MASK)
+            if flags & PlayerFlags.BOMB:
+                roster['bomb_holders'].append(address)
+            if flags & PlayerFlags.READY:
+                roster['ready'].append(address)
+        return roster
+
+    @staticmethod
+    def summarize_header(header: dict) -> dict:
+        """ Summary of a game built from its decoded header, without loading the players """
+        if 'players_count' in header:
+            players_count = header['players_count']
+        else:
+            # Full gamestates written by a previous deployment have no roster
+            players_count = len(header['roster'] if 'roster' in header else header['players'])
+        return {
+            'token' : header['token'],
+            'cost' : header['cost'],
+            'host' : header['host'],
+            'created' : header['created'],
+            'started' : header['started'],
+            'players_count' : players_count,
+            'ready_timestamp' : header['ready_timestamp'],
+            'version' : header.get('version', 0),
+            'max_players' : header.get('max_players', GameState._MAXIMUM_PLAYERS_IN_GAME),
+            'bombs' : header.get('bombs', 1)
+        }
+
+    def serialize_result(self, winner: str, reward: int, now: int) -> dict:
+        """ Final result of a started game, winner is None if the game has been reset """
+        return {
+            'token' : self._token,
+            'cost' : self._cost,
+            'winner' : winner,
+            'players' : self.get_all_addresses(),
+            'started' : self._started,
+            'duration' : now - self._started,
+            'reward' : reward
+        }
+
+    def serialize_delta(self, version: int) -> dict:
+        """ Header with the players written after the given version of the game.
+            Players missing from the roster have left the game """
+        delta = self.serialize_header()
+        delta['players'] = {player.address: player.serialize()
+                            for player in self.get_all_players()
+                            if player.version > version}
+        return delta
+
     def to_json(self) -> str:
         return json_dumps(self.serialize())
 
@@ -455,3 +817,11 @@ class GameState:
     @property
     def token(self) -> str:
         return self._token
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def host(self) -> str:
+        return self._host
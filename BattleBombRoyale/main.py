@@ -1,7 +1,10 @@
 from iconservice import *
 from .gamestate.gamestate import *
 from .player.player import *
+from .roster.roster import *
 from .account.account import *
+from .codec.codec import *
+from .setdb.setdb import *
 from .utils.utils import *
 
 TAG = 'BattleBombRoyale'
@@ -44,19 +47,88 @@ class BattleBombRoyale(IconScoreBase):
     # ================================================
     #  DB Variables
     # ================================================
-    # gamestates : A dictionary of created games containing all
-    #              variables related to the corresponding game
+    # gamestates : A dictionary of created games containing the
+    #              header variables related to the corresponding game
     _GAMESTATES = 'gamestates'
+    # game_players : A dictionary of created games containing a dictionary
+    #                of the players inside, indexed by their address
+    _GAME_PLAYERS = 'game_players'
+    # game_events : A list for each created game containing the hashes
+    #               of the transactions which triggered an event in the game,
+    #               kept while the result of the game is in finished_games
+    _GAME_EVENTS = 'game_events'
+    # game_events_pruned : A list of the destroyed games whose events
+    #                      can't be read anymore and are removed by batches
+    _GAME_EVENTS_PRUNED = 'game_events_pruned'
+    # game_rosters : Sets for each royale game containing the addresses
+    #                of its players, by state, bomb ownership and readiness
+    _GAME_ROSTERS = 'game_rosters'
     # games : A list of references to the created games
     _GAMES = 'games'
+    # games_index : A dictionary of created games containing
+    #               the position of the game token inside games
+    _GAMES_INDEX = 'games_index'
+    # game_digests : A dictionary of games containing the XOR of
+    #                the hashes of their header and players records
+    _GAME_DIGESTS = 'game_digests'
+    # games_sequence : Sequence number given to the last created game,
+    #                  sequence numbers start from 1
+    _GAMES_SEQUENCE = 'games_sequence'
+    # games_first : Sequence number of the oldest game not destroyed, 0 if none
+    _GAMES_FIRST = 'games_first'
+    # games_last : Sequence number of the newest game not destroyed, 0 if none
+    _GAMES_LAST = 'games_last'
+    # games_previous : A dictionary of sequence numbers containing the sequence
+    #                  number of the previous game not destroyed, 0 if none
+    _GAMES_PREVIOUS = 'games_previous'
+    # games_next : A dictionary of sequence numbers containing the sequence
+    #              number of the next game not destroyed, 0 if none
+    _GAMES_NEXT = 'games_next'
+    # games_by_sequence : A dictionary of sequence numbers containing
+    #                     the token of the game created with it
+    _GAMES_BY_SEQUENCE = 'games_by_sequence'
+    # games_sequence_number : A dictionary of created games containing
+    #                         their sequence number
+    _GAMES_SEQUENCE_NUMBER = 'games_sequence_number'
     # player_rooms : A dictionary of players containing a game
     #               token if the player is playing inside
     _PLAYER_ROOMS = 'player_rooms'
+    # player_history : A dictionary of players containing the
+    #                  list of their last games, the last one first
+    _PLAYER_HISTORY = 'player_history'
     # accounts : A dictionary of players containing
     #                   global player accounts
     _ACCOUNTS = 'accounts'
     # operator_fees : Sum of all operator fees retrieved
     _OPERATOR_FEES = 'operator_fees'
+    # open_lobbies : A set for each allowed participation cost containing
+    #                the tokens of the games which can still be joined
+    _OPEN_LOBBIES = 'open_lobbies'
+    # games_by_status : A set for each game status containing
+    #                   the tokens of the games with that status
+    _GAMES_BY_STATUS = 'games_by_status'
+    # statistics : Global statistics of the games, one counter for each
+    #              field of GameState.STATISTICS
+    _STATISTICS = 'statistics'
+    # statistics_counted : A dictionary of the games already counted in the
+    #                      statistics while they are migrated
+    _STATISTICS_COUNTED = 'statistics_counted'
+    # finished_games : Ring buffer of the results of the last finished games,
+    #                  indexed by their finish order modulo its capacity
+    _FINISHED_GAMES = 'finished_games'
+    # finished_games_count : Number of finished games ever archived
+    _FINISHED_GAMES_COUNT = 'finished_games_count'
+    # finished_games_tokens : A dictionary of the games whose result
+    #                         is in finished_games
+    _FINISHED_GAMES_TOKENS = 'finished_games_tokens'
+    # leaderboard : Addresses and ICX won of the accounts who won the most ICX
+    _LEADERBOARD = 'leaderboard'
+    # storage_version : Version of the storage layout
+    #                   all the games have been migrated to
+    _STORAGE_VERSION = 'storage_version'
+    # migration_cursor : Count of games at the beginning of the games
+    #                    list not migrated yet to the latest storage version
+    _MIGRATION_CURSOR = 'migration_cursor'
 
     # ================================================
     #  Error codes
@@ -92,6 +164,7 @@ class BattleBombRoyale(IconScoreBase):
     _INVALID_ACCOUNT_NAME = 'INVALID_ACCOUNT_NAME'
     _NOT_ENOUGH_OPERATOR_FEES = 'NOT_ENOUGH_OPERATOR_FEES'
     _GAME_IS_FULL = 'GAME_IS_FULL'
+    _INVALID_ROYALE_SETTINGS = 'INVALID_ROYALE_SETTINGS'
     _MAXIMUM_GAMES_COUNT_REACHED = 'MAXIMUM_GAMES_COUNT_REACHED'
 
     # ================================================
@@ -111,19 +184,71 @@ class BattleBombRoyale(IconScoreBase):
     # Number of simultaneous games allowed
     _MAXIMUM_GAMES_COUNT = 10000
 
+    # Maximum number of items returned by a paginated getter
+    _MAXIMUM_PAGE_SIZE = 100
+    # Maximum number of sequence numbers read to resume a page of games
+    # from the cursor of a destroyed game
+    _MAXIMUM_PAGE_SCAN = 100
+    # Number of results kept in the finished games archive
+    _FINISHED_GAMES_CAPACITY = 1000
+    # Maximum number of events of destroyed games removed by a single call
+    _MAXIMUM_EVENTS_PRUNED = 100
+    # Number of games kept in the history of a player
+    _PLAYER_HISTORY_SIZE = 20
+    # Number of accounts in the leaderboard
+    _LEADERBOARD_SIZE = 10
+    # Maximum number of items returned by a batch getter
+    _MAXIMUM_BATCH_SIZE = 100
+
+    # Version of the storage layout written by this SCORE. Games stored by
+    # a previous deployment (version 0) get their binary records, their
+    # indexes and their place in the statistics once migrated
+    _LATEST_STORAGE_VERSION = 1
+    # Maximum number of games migrated in a single call
+    _MAXIMUM_MIGRATION_BATCH = 100
+
     def __init__(self, db: IconScoreDatabase) -> None:
         super().__init__(db)
-        self._gamestates = DictDB(self._GAMESTATES, db, value_type=str)
+        self._gamestates = DictDB(self._GAMESTATES, db, value_type=bytes)
+        self._game_players = DictDB(self._GAME_PLAYERS, db, value_type=bytes, depth=2)
+        self._game_digests = DictDB(self._GAME_DIGESTS, db, value_type=bytes)
         self._games = ArrayDB(self._GAMES, db, value_type=str)
+        self._games_index = DictDB(self._GAMES_INDEX, db, value_type=int)
+        self._games_sequence = VarDB(self._GAMES_SEQUENCE, db, value_type=int)
+        self._games_by_sequence = DictDB(self._GAMES_BY_SEQUENCE, db, value_type=str)
+        self._games_sequence_number = DictDB(self._GAMES_SEQUENCE_NUMBER, db, value_type=int)
+        self._games_first = VarDB(self._GAMES_FIRST, db, value_type=int)
+        self._games_last = VarDB(self._GAMES_LAST, db, value_type=int)
+        self._games_previous = DictDB(self._GAMES_PREVIOUS, db, value_type=int)
+        self._games_next = DictDB(self._GAMES_NEXT, db, value_type=int)
         self._player_rooms = DictDB(self._PLAYER_ROOMS, db, value_type=str)
+        self._player_history = DictDB(self._PLAYER_HISTORY, db, value_type=str)
         self._accounts = DictDB(self._ACCOUNTS, db, value_type=str)
         self._operator_fees = VarDB(self._OPERATOR_FEES, db, value_type=int)
+        self._finished_games = DictDB(self._FINISHED_GAMES, db, value_type=str)
+        self._finished_games_count = VarDB(self._FINISHED_GAMES_COUNT, db, value_type=int)
+        self._finished_games_tokens = DictDB(self._FINISHED_GAMES_TOKENS, db, value_type=bool)
+        self._game_events_pruned = ArrayDB(self._GAME_EVENTS_PRUNED, db, value_type=str)
+        self._leaderboard = VarDB(self._LEADERBOARD, db, value_type=str)
+        self._storage_version = VarDB(self._STORAGE_VERSION, db, value_type=int)
+        self._migration_cursor = VarDB(self._MIGRATION_CURSOR, db, value_type=int)
+        self._statistics = {field: VarDB(self._STATISTICS + '_' + field, db, value_type=int)
+                            for field in GameState.STATISTICS}
+        self._statistics_counted = DictDB(self._STATISTICS_COUNTED, db, value_type=bool)
+        # Identity map of the gamestates and accounts loaded during the current call,
+        # with the statistics of the loaded gamestates already counted in the statedb
+        self._reset_identity_map()
 
     def on_install(self) -> None:
         super().on_install()
+        self._storage_version.set(self._LATEST_STORAGE_VERSION)
 
     def on_update(self) -> None:
         super().on_update()
+        # Games can't all be migrated in a single transaction,
+        # they are migrated by batches with migrate_games instead
+        if self._is_migrating():
+            self._migration_cursor.set(len(self._games))
 
     # ================================================
     #  Checks
@@ -133,11 +258,13 @@ class BattleBombRoyale(IconScoreBase):
             raise MaximumGamesCountReached
 
     def _check_game_doesnt_exist(self, token: str) -> None:
-        if token in self._games:
+        if self._game_exists(token):
             raise GameAlreadyExists
 
     def _check_game_already_exists(self, token: str) -> None:
-        if not token in self._games:
+        if token in self._get_loaded_gamestates():
+            return
+        if not self._game_exists(token):
             raise GameDoesntExist
 
     def _check_is_score_operator(self, sender: Address) -> None:
@@ -301,19 +428,155 @@ class BattleBombRoyale(IconScoreBase):
     def _player_register_game(self, game: GameState, player: Player) -> None:
         self._player_rooms[player.address] = game.token
 
-    def _player_unregister_game(self, player: Player, token: str) -> None:
+    def _player_unregister_game(self, address: str, token: str) -> None:
         # Only unregister players still in the current game
-        if self.get_player_room(player.address) == token:
-            self._player_rooms.remove(player.address)
+        if self._player_rooms[address] == token:
+            self._player_rooms.remove(address)
+
+    def _get_player_history(self, address: str) -> list:
+        history = self._player_history[address]
+        return json_loads(history) if history else []
+
+    def _player_history_add(self, address: str, token: str, role: str) -> None:
+        # The oldest game is dropped once the history is full
+        history = [{'token': token, 'role': role, 'result': None}] + self._get_player_history(address)
+        self._player_history[address] = json_dumps(history[:self._PLAYER_HISTORY_SIZE])
+
+    def _player_history_end(self, address: str, token: str, result: str) -> None:
+        # Only the first result of a game is kept, a player who
+        # left a started game doesn't lose it once again
+        history = self._get_player_history(address)
+        for entry in history:
+            if entry['token'] == token:
+                if entry['result'] is None:
+                    entry['result'] = result
+                    self._player_history[address] = json_dumps(history)
+                return
+
+    def _player_history_set_role(self, address: str, token: str, role: str) -> None:
+        # Only written if the role changed, the history of a player who
+        # joined before it was kept doesn't contain the game
+        history = self._get_player_history(address)
+        for entry in history:
+            if entry['token'] == token:
+                if entry['role'] != role:
+                    entry['role'] = role
+                    self._player_history[address] = json_dumps(history)
+                return
+
+    def _get_loaded_gamestates(self) -> dict:
+        return self._loaded_gamestates
+
+    def _get_loaded_accounts(self) -> dict:
+        return self._loaded_accounts
+
+    def _reset_identity_map(self) -> None:
+        # The SCORE instance may be reused between calls, and a reverted
+        # call doesn't flush its objects : each external method starts
+        # with an empty identity map
+        self._loaded_gamestates = {}
+        self._loaded_accounts = {}
+        self._loaded_statistics = {}
 
     def _get_gamestate_object(self, token: str) -> GameState:
         """ Must call _check_game_already_exists before """
-        gamestate_json = self._get_gamestate(token)
-        return GameState.from_json(gamestate_json)
+        loaded = self._get_loaded_gamestates()
+        if not token in loaded:
+            loaded[token] = self._load_gamestate_object(token)
+            if self._is_counted_in_statistics(token):
+                self._loaded_statistics[token] = loaded[token].get_statistics()
+        return loaded[token]
+
+    def _add_gamestate_object(self, game: GameState) -> None:
+        self._get_loaded_gamestates()[game.token] = game
+
+    def _load_gamestate_object(self, token: str) -> GameState:
+        data = self._gamestates[token]
+        header = GameState.decode_header(data)
+
+        if 'players' in header:
+            # Gamestate stored as a single record by a previous deployment,
+            # everything needs to be written on the next update
+            game = GameState.deserialize(header)
+            game.set_dirty()
+            for player in game.get_all_players():
+                player.set_dirty()
+            return game
+
+        players = self._game_players[token]
+        roster = self._get_game_roster(token) if GameState.is_royale_header(header) else None
+        game = GameState.deserialize_header(header,
+            lambda address: self._get_player_object(players, address), roster)
+        # Records written with a previous layout are rewritten on the next update
+        if Codec.is_outdated(data):
+            game.set_dirty()
+        return game
+
+    def _get_player_object(self, players: DictDB, address: str) -> Player:
+        data = players[address]
+        player = Player.decode(data)
+        if Codec.is_outdated(data):
+            player.set_dirty()
+        return player
+
+    def _get_game_events(self, token: str) -> ArrayDB:
+        return ArrayDB(self._GAME_EVENTS + '_' + token, self.db, value_type=bytes)
+
+    def _get_game_roster(self, token: str) -> Roster:
+        return Roster.in_database(self._GAME_ROSTERS + '_' + token, self.db)
 
     def _get_gamestate(self, token: str) -> str:
         """ Must call _check_game_already_exists before """
-        return self._gamestates[token]
+        return self._get_gamestate_object(token).to_json()
+
+    def _get_game_summary(self, token: str) -> dict:
+        """ Must call _check_game_already_exists before """
+        # Only the header is read, players and events aren't needed
+        header = GameState.decode_header(self._gamestates[token])
+        return GameState.summarize_header(header)
+
+    def _serialize_gamestate(self, token: str) -> dict:
+        """ Must call _check_game_already_exists before """
+        return self._get_gamestate_object(token).serialize()
+
+    def _get_games_page(self, cursor: int, limit: int, getter) -> tuple:
+        # Games are returned by creation order following their links, so
+        # destroying a game doesn't change the order of the others and
+        # destroyed games are never read. The cursor is the sequence
+        # number of the first game of the page
+        limit = min(limit, self._MAXIMUM_PAGE_SIZE)
+        sequence, next_cursor = self._get_page_start(cursor)
+        items = []
+
+        while sequence and len(items) < limit:
+            items.append(getter(self._games_by_sequence[sequence]))
+            sequence = self._games_next[sequence]
+
+        return items, (sequence if sequence else next_cursor)
+
+    def _get_page_start(self, cursor: int) -> tuple:
+        """ Sequence number of the first game not destroyed from the cursor,
+            0 if none, and the cursor to continue from if none was found """
+        # A cursor before the oldest game starts the games list
+        first = self._games_first.get()
+        if cursor <= first:
+            return first, None
+        if cursor > self._games_last.get():
+            return 0, None
+
+        # The game of a cursor may have been destroyed since the cursor has
+        # been given, the following sequence numbers are read until a game
+        # is found. There is always one, the newest game is after the cursor
+        end = cursor + self._MAXIMUM_PAGE_SCAN
+        for sequence in range(cursor, end):
+            if sequence in self._games_by_sequence:
+                return sequence, None
+        return 0, end
+
+    def _split_batch(self, keys: str) -> list:
+        # Lists can't be passed as parameters, keys are separated by commas
+        keys = [key.strip() for key in keys.split(',') if key.strip()]
+        return keys[:self._MAXIMUM_BATCH_SIZE]
 
     def _get_player_room(self, address: str) -> str:
         """ Must call _check_player_registred before """
@@ -325,47 +588,295 @@ class BattleBombRoyale(IconScoreBase):
 
     def _get_account_object(self, address: str) -> Account:
         """ Must call _check_account_exists before """
-        account_json = self._get_account(address)
-        return Account.from_json(account_json)
+        loaded = self._get_loaded_accounts()
+        if not address in loaded:
+            loaded[address] = Account.from_json(self._get_account(address))
+        return loaded[address]
+
+    def _add_account_object(self, account: Account, address: str) -> None:
+        self._get_loaded_accounts()[address] = account
+
+    def _get_or_create_account_object(self, address: str) -> Account:
+        # A new account is only stored if it is modified
+        if not address in self._get_loaded_accounts():
+            try:
+                self._check_account_exists(address)
+            except AccountDoesntExist:
+                self._add_account_object(self._get_default_account(address), address)
+        return self._get_account_object(address)
 
     def _get_default_account(self, address: str) -> Account:
         # Give a pseudo random name to the player
         return Account(address, "Player_" + address[-4:])
 
+    def _is_migrating(self) -> bool:
+        return self._storage_version.get() < self._LATEST_STORAGE_VERSION
+
+    def _is_counted_in_statistics(self, token: str) -> bool:
+        # Games stored by a previous deployment aren't counted
+        # in the statistics until they are loaded or migrated
+        if not self._is_migrating():
+            return True
+        return token in self._statistics_counted
+
+    def _game_exists(self, token: str) -> bool:
+        if token in self._games_index:
+            return True
+        # Games created by a previous deployment are indexed once migrated
+        return self._is_migrating() and token in self._games
+
+    def _get_game_index(self, token: str) -> int:
+        if token in self._games_index:
+            return self._games_index[token]
+        # Games created by a previous deployment are indexed once migrated
+        for index, cur in enumerate(self._games):
+            if cur == token:
+                return index
+
+    def _game_migrate(self, token: str, index: int) -> None:
+        self._games_index[token] = index
+        if not token in self._games_sequence_number:
+            self._game_add_sequence_number(token)
+        # Records written with a previous layout are rewritten when flushed
+        game = self._get_gamestate_object(token)
+        self._update_open_lobbies(game, token)
+        self._update_games_by_status(game, token)
+
+    def _game_add_sequence_number(self, token: str) -> None:
+        sequence = self._games_sequence.get() + 1
+        self._games_sequence.set(sequence)
+        self._games_by_sequence[sequence] = token
+        self._games_sequence_number[token] = sequence
+
+        # Link the game after the newest game
+        last = self._games_last.get()
+        if last:
+            self._games_next[last] = sequence
+            self._games_previous[sequence] = last
+        else:
+            self._games_first.set(sequence)
+        self._games_last.set(sequence)
+
+    def _game_remove_sequence_number(self, token: str) -> None:
+        sequence = self._games_sequence_number[token]
+        previous = self._games_previous[sequence]
+        following = self._games_next[sequence]
+
+        # Unlink the game from its neighbours
+        if previous:
+            self._games_next[previous] = following
+        else:
+            self._games_first.set(following)
+        if following:
+            self._games_previous[following] = previous
+        else:
+            self._games_last.set(previous)
+
+        self._games_next.remove(sequence)
+        self._games_previous.remove(sequence)
+        self._games_by_sequence.remove(sequence)
+        self._games_sequence_number.remove(token)
+
+    def _game_register(self, token: str) -> None:
+        self._games_index[token] = len(self._games)
+        self._games.put(token)
+        self._game_add_sequence_number(token)
+
     def _game_destroy(self, token: str) -> None:
-        games = []
-        # Iterate through games list and find the deleted game
-        while self._games:
-            cur = self._games.pop()
-            if cur != token:
-                games.append(cur)
-            else:
-                break
+        # Move the last game in place of the deleted game, so
+        # the removal doesn't depend on the games count
+        index = self._get_game_index(token)
+        last = self._games.pop()
+        if last != token:
+            self._games[index] = last
+            self._games_index[last] = index
+
+        self._games_index.remove(token)
 
-        # Add again the other games
-        while games:
-            cur = games.pop()
-            self._games.put(cur)
+        if token in self._games_sequence_number:
+            self._game_remove_sequence_number(token)
 
     def _update_account_db(self, account: Account, address: str) -> None:
-        self._accounts[address] = account.to_json()
+        if account.is_dirty():
+            self._accounts[address] = account.to_json()
+            account.clear_dirty()
+
+    def _get_leaderboard(self) -> list:
+        leaderboard = self._leaderboard.get()
+        return json_loads(leaderboard) if leaderboard else []
+
+    def _update_leaderboard(self) -> None:
+        accounts = [account for account in self._get_loaded_accounts().values()
+                    if account.is_dirty('icx_won')]
+        if not accounts:
+            return
+
+        # The leaderboard is a list of [address, icx_won] sorted by ICX won
+        addresses = set(account.address for account in accounts)
+        leaderboard = [entry for entry in self._get_leaderboard() if not entry[0] in addresses]
+        leaderboard += [[account.address, account.icx_won] for account in accounts]
+        leaderboard.sort(key=lambda entry: entry[1], reverse=True)
+        self._leaderboard.set(json_dumps(leaderboard[:self._LEADERBOARD_SIZE]))
+
+    def _flush(self) -> None:
+        # Events of the games destroyed by the previous calls
+        self._prune_game_events()
+        # Write all the objects loaded during the call, once
+        for token, game in self._get_loaded_gamestates().items():
+            self._update_game_db(game, token)
+        self._update_statistics()
+        self._update_leaderboard()
+        for address, account in self._get_loaded_accounts().items():
+            self._update_account_db(account, address)
+        self._reset_identity_map()
+
+    def _update_statistics(self) -> None:
+        # Only the difference between the statistics of the games
+        # when loaded and when written is added to the counters
+        changes = dict.fromkeys(GameState.STATISTICS, 0)
+        for token, game in self._get_loaded_gamestates().items():
+            before = self._loaded_statistics.get(token)
+            after = game.get_statistics()
+            for field in GameState.STATISTICS:
+                changes[field] += after[field] - (before[field] if before else 0)
+            self._update_statistics_counted(game, token)
+
+        for field, change in changes.items():
+            if change != 0:
+                counter = self._statistics[field]
+                counter.set(counter.get() + change)
+
+    def _update_statistics_counted(self, game: GameState, token: str) -> None:
+        # Games are only marked while the statistics are migrated
+        if game.is_over():
+            if token in self._statistics_counted:
+                self._statistics_counted.remove(token)
+        elif self._is_migrating():
+            if not token in self._statistics_counted:
+                self._statistics_counted[token] = True
 
     def _gamestate_cleanup(self, game: GameState, token: str) -> None:
         # Unregister all players to the game
-        for player in game.get_all_players():
-            self._player_unregister_game(player, token)
+        for address in game.get_all_addresses():
+            self._player_unregister_game(address, token)
         # Cleanup the gamestate from the statedb
-        self._gamestate_destroy(token)
+        self._gamestate_destroy(game, token)
+
+    def _get_open_lobbies(self, cost: int) -> SetDB:
+        return SetDB(self._OPEN_LOBBIES + '_' + str(cost), self.db)
+
+    def _update_open_lobbies(self, game: GameState, token: str) -> None:
+        lobbies = self._get_open_lobbies(game.get_participation_cost())
+        if game.is_joinable():
+            lobbies.add(token)
+        else:
+            lobbies.remove(token)
+
+    def _get_games_by_status(self, status: str) -> SetDB:
+        return SetDB(self._GAMES_BY_STATUS + '_' + status, self.db)
+
+    def _update_games_by_status(self, game: GameState, token: str) -> None:
+        current = game.get_status()
+        for status in GameStatus.ALL:
+            games = self._get_games_by_status(status)
+            if status == current:
+                games.add(token)
+            else:
+                games.remove(token)
 
     def _update_game_db(self, game: GameState, token: str) -> None:
+        """ Must only be called by _flush, external methods end with _flush
+            so the objects of the identity map are written and released """
+        # A game can only be joined or left if its players or its state changed
+        if game.is_over() or game.is_dirty('roster') or game.is_dirty('started'):
+            self._update_open_lobbies(game, token)
+        if game.is_over() or game.is_dirty('ready_timestamp') or game.is_dirty('started'):
+            self._update_games_by_status(game, token)
+
         if game.is_over():
             self._gamestate_cleanup(game, token)
             self._game_destroy(token)
         else:
-            self._gamestates[token] = game.to_json()
-
-    def _gamestate_destroy(self, token: str) -> None:
+            # A new host is picked when the host leaves the game
+            if game.is_dirty('host'):
+                self._player_history_set_role(game.host, token, 'host')
+            self._gamestate_write(game, token)
+
+    def _gamestate_write(self, game: GameState, token: str) -> None:
+        # Any modification gives a new version to the game,
+        # players written are tagged with that version
+        dirty_players = game.get_dirty_players()
+        if game.is_dirty() or dirty_players or game.get_removed_addresses():
+            game.increment_version()
+
+        # The digest of a new game starts empty, games written before
+        # digests were stored get a full one once written
+        digest = self._game_digests[token]
+        if digest is None and not token in self._gamestates:
+            digest = bytes(32)
+
+        # Only write what has been modified during the transaction
+        if game.is_dirty():
+            digest = self._record_write(self._gamestates, token, game.encode_header(), digest)
+
+        players = self._game_players[token]
+        for player in dirty_players:
+            player.set_version(game.version)
+            digest = self._record_write(players, player.address, player.encode(), digest)
+        for address in game.get_removed_addresses():
+            digest = self._record_write(players, address, None, digest)
+        game.clear_dirty()
+
+        if digest is None:
+            digest = self._compute_game_digest(game, token)
+        self._game_digests[token] = digest
+
+        # Events are only appended, the header doesn't grow with the game
+        new_events = game.pop_new_events()
+        if new_events:
+            events = self._get_game_events(token)
+            for event in new_events:
+                events.put(bytes.fromhex(event))
+
+    def _record_write(self, db: DictDB, key: str, data: bytes, digest: bytes) -> bytes:
+        """ Write or remove (if data is None) a record, and replace
+            the hash of the previous record by the new one in the digest """
+        if digest is not None:
+            previous = db[key]
+            if previous:
+                digest = Utils.xor_bytes(digest, sha3_256(previous))
+            if data:
+                digest = Utils.xor_bytes(digest, sha3_256(data))
+
+        if data:
+            db[key] = data
+        else:
+            db.remove(key)
+        return digest
+
+    def _compute_game_digest(self, game: GameState, token: str) -> bytes:
+        digest = sha3_256(self._gamestates[token])
+        players = self._game_players[token]
+        for address in game.get_all_addresses():
+            # Players stored by a previous deployment are inside the header
+            data = players[address]
+            if data:
+                digest = Utils.xor_bytes(digest, sha3_256(data))
+        return digest
+
+    def _gamestate_destroy(self, game: GameState, token: str) -> None:
+        # Players who left during the transaction aren't in the game anymore
+        players = self._game_players[token]
+        for address in game.get_all_addresses() + game.get_removed_addresses():
+            players.remove(address)
+        # The events of an archived game can be read until its result is
+        # dropped from the archive, the others are removed from now on
+        if not token in self._finished_games_tokens:
+            self._game_events_pruned.put(token)
+        if game.is_royale():
+            self._get_game_roster(token).clear()
         self._gamestates.remove(token)
+        self._game_digests.remove(token)
 
     def _send_reward(self, game: GameState, player: Player, amount: int) -> None:
         address = Address.from_string(player.address)
@@ -376,6 +887,7 @@ class BattleBombRoyale(IconScoreBase):
     def _send_loot_reward(self, game: GameState, looter: Player, looted: Player) -> None:
         reward = game.get_loot_reward()
         self._send_reward(game, looter, reward)
+        self._get_or_create_account_object(looter.address).add_loot(reward)
         self._trigger_loot_reward_event(game, looter, looted, reward)
 
     def _send_win_reward(self, game: GameState, winner: Player, reward: int) -> None:
@@ -393,23 +905,72 @@ class BattleBombRoyale(IconScoreBase):
         current_fees = self._operator_fees.get()
         self._operator_fees.set(current_fees + new_fees)
 
+    def _archive_game(self, game: GameState, winner: Player, reward: int) -> None:
+        # The oldest result is overwritten once the archive is full,
+        # the events of its game are removed with it
+        count = self._finished_games_count.get()
+        position = count % self._FINISHED_GAMES_CAPACITY
+        if count >= self._FINISHED_GAMES_CAPACITY:
+            dropped = json_loads(self._finished_games[position])['token']
+            self._finished_games_tokens.remove(dropped)
+            self._game_events_pruned.put(dropped)
+
+        result = game.serialize_result(winner.address if winner else None, reward, self.now())
+        self._finished_games[position] = json_dumps(result)
+        self._finished_games_tokens[game.token] = True
+        self._finished_games_count.set(count + 1)
+
+    def _prune_game_events(self) -> None:
+        # Events are removed by bounded batches, so neither ending a
+        # game nor any other call depends on the length of a game
+        budget = self._MAXIMUM_EVENTS_PRUNED
+        while budget > 0 and len(self._game_events_pruned) > 0:
+            events = self._get_game_events(self._game_events_pruned[-1])
+            while budget > 0 and len(events) > 0:
+                events.pop()
+                budget -= 1
+            if len(events) == 0:
+                self._game_events_pruned.pop()
+                budget -= 1
+
+    def _reset_game(self, token: str) -> None:
+        game = self._get_gamestate_object(token)
+
+        # Refund players
+        for player in game.get_all_players():
+            self._refund_participation_cost(game, player)
+
+        # Only games which have been played are archived
+        if game.is_started():
+            self._archive_game(game, None, 0)
+
+        for address in game.get_all_addresses():
+            self._player_history_end(address, token, 'reset')
+            if game.is_started():
+                self._get_or_create_account_object(address).add_game_played()
+
+        # Close the game, it is cleaned up when flushed
+        game.over()
+
     def _process_victory(self, game: GameState, winner: Player, reward: int) -> None:
         game.check_is_started()
         game.check_is_victory()
         game.check_winner(winner)
         # Only one player remaining, victory!
         self._send_win_reward(game, winner, reward)
+        self._get_or_create_account_object(winner.address).add_win(reward)
+        self._archive_game(game, winner, reward)
+        # Games played are counted once over, so starting
+        # a game doesn't depend on the players count
+        for address in game.get_all_addresses():
+            self._player_history_end(address, game.token, 'won' if address == winner.address else 'lost')
+            self._get_or_create_account_object(address).add_game_played()
         # Handle operator fees
         self._send_operator_fees(game)
         # Close the game
         game.over()
 
-    # ================================================
-    #  Extern methods
-    # ================================================
-    @payable
-    @external(readonly=False)
-    def create_game(self) -> None:
+    def _create_game(self, max_players: int = None, bombs: int = 1) -> None:
         amount = self.msg.value
         token = self.tx.hash.hex()
         created = self.now()
@@ -435,7 +996,12 @@ class BattleBombRoyale(IconScoreBase):
         # Build new GameState
         try:
             player = Player(address)
-            game = GameState(token, amount, player.address, created)
+            # The roster of a royale game is stored in the state DB
+            roster = self._get_game_roster(token) if max_players else None
+            game = GameState(token, amount, player.address, created,
+                             max_players=max_players, bombs=bombs, roster=roster)
+            # A new game has never been stored
+            game.set_dirty()
             game.deposit_reward(amount)
             game.join(player)
             self._trigger_create_game_event(game, player)
@@ -448,12 +1014,37 @@ class BattleBombRoyale(IconScoreBase):
         # ==========================
         # Update Game DB
         self._player_register_game(game, player)
-        self._games.put(token)
-        self._update_game_db(game, token)
+        self._player_history_add(player.address, token, 'host')
+        self._game_register(token)
+        self._add_gamestate_object(game)
+        self._flush()
+
+    # ================================================
+    #  Extern methods
+    # ================================================
+    @payable
+    @external(readonly=False)
+    def create_game(self) -> None:
+        self._reset_identity_map()
+        self._create_game()
+
+    @payable
+    @external(readonly=False)
+    def create_royale_game(self, max_players: int, bombs: int) -> None:
+        self._reset_identity_map()
+        # ==========================
+        # Input Checks
+        try:
+            GameState.check_royale_settings(max_players, bombs)
+        except InvalidRoyaleSettings:
+            revert(self._INVALID_ROYALE_SETTINGS)
+
+        self._create_game(max_players, bombs)
 
     @payable
     @external(readonly=False)
     def join_game(self, token: str) -> None:
+        self._reset_identity_map()
         amount = self.msg.value
         address = str(self.msg.sender)
 
@@ -499,10 +1090,12 @@ class BattleBombRoyale(IconScoreBase):
         # ==========================
         # Update Game DB
         self._player_register_game(game, player)
-        self._update_game_db(game, token)
+        self._player_history_add(player.address, token, 'player')
+        self._flush()
 
     @external(readonly=False)
     def win_game(self) -> None:
+        self._reset_identity_map()
         address = str(self.msg.sender)
 
         # ==========================
@@ -548,10 +1141,11 @@ class BattleBombRoyale(IconScoreBase):
 
         # ==========================
         # Update Game DB
-        self._update_game_db(game, token)
+        self._flush()
 
     @external(readonly=False)
     def loot_player(self, looted_address: str) -> None:
+        self._reset_identity_map()
         seed = str(bytes.hex(self.tx.hash)) + str(self.now()) + str(self.msg.sender)
         now = self.now()
         looter_address = str(self.msg.sender)
@@ -618,10 +1212,11 @@ class BattleBombRoyale(IconScoreBase):
 
         # ==========================
         # Update Game DB
-        self._update_game_db(game, token)
+        self._flush()
 
     @external(readonly=False)
     def send_bomb(self, use_shield: int) -> None:
+        self._reset_identity_map()
         seed = str(bytes.hex(self.tx.hash)) + str(self.now()) + str(self.msg.sender)
         now = self.now()
         address = str(self.msg.sender)
@@ -682,10 +1277,11 @@ class BattleBombRoyale(IconScoreBase):
 
         # ==========================
         # Update Game DB
-        self._update_game_db(game, token)
+        self._flush()
 
     @external(readonly=False)
     def ready_ask(self) -> None:
+        self._reset_identity_map()
         address = str(self.msg.sender)
         now = self.now()
 
@@ -730,10 +1326,11 @@ class BattleBombRoyale(IconScoreBase):
 
         # ==========================
         # Update Game DB
-        self._update_game_db(game, token)
+        self._flush()
 
     @external(readonly=False)
     def ready_ok(self) -> None:
+        self._reset_identity_map()
         address = str(self.msg.sender)
 
         # ==========================
@@ -772,10 +1369,11 @@ class BattleBombRoyale(IconScoreBase):
 
         # ==========================
         # Update Game DB
-        self._update_game_db(game, token)
+        self._flush()
 
     @external(readonly=False)
     def start_game(self) -> None:
+        self._reset_identity_map()
         seed = str(bytes.hex(self.tx.hash)) + str(self.now()) + str(self.msg.sender)
         started = self.now()
         address = str(self.msg.sender)
@@ -817,12 +1415,13 @@ class BattleBombRoyale(IconScoreBase):
             # Go!
             afkers = game.start(started)
             self._trigger_start_game_event(game, player)
-            receiver = game.get_player_with_bomb()
-            self._trigger_recv_bomb_event(game, receiver, receiver.get_bomb())
+            for receiver in game.get_players_with_bomb():
+                self._trigger_recv_bomb_event(game, receiver, receiver.get_bomb())
 
             # Remove & Refund players not ready
             for afker in afkers:
-                self._player_unregister_game(afker, game.token)
+                self._player_unregister_game(afker.address, game.token)
+                self._player_history_end(afker.address, game.token, 'left')
                 self._trigger_afk_start_game_event(game, afker)
                 self._refund_participation_cost(game, afker)
 
@@ -837,22 +1436,16 @@ class BattleBombRoyale(IconScoreBase):
 
         # ==========================
         # Update Game DB
-        self._update_game_db(game, token)
+        self._flush()
 
     @external(readonly=False)
     def set_account_name(self, name: str) -> None:
+        self._reset_identity_map()
         address = str(self.msg.sender)
 
         # ==========================
         # Retrieve Player Account
-        try:
-            self._check_account_exists(address)
-        except AccountDoesntExist:
-            # Create a new account
-            account = self._get_default_account(address)
-        else:
-            # Get account from State DB
-            account = self._get_account_object(address)
+        account = self._get_or_create_account_object(address)
 
         # ==========================
         # Process Player Account
@@ -863,10 +1456,11 @@ class BattleBombRoyale(IconScoreBase):
 
         # ==========================
         # Update Account DB
-        self._update_account_db(account, address)
+        self._flush()
 
     @external(readonly=False)
     def quit_game(self) -> None:
+        self._reset_identity_map()
         seed = str(bytes.hex(self.tx.hash)) + str(self.now()) + str(self.msg.sender)
         address = str(self.msg.sender)
 
@@ -897,7 +1491,8 @@ class BattleBombRoyale(IconScoreBase):
         try:
             Utils.srand(seed)
             leaver = game.get_player(address)
-            self._player_unregister_game(leaver, game.token)
+            self._player_unregister_game(leaver.address, game.token)
+            self._player_history_end(leaver.address, game.token, 'left')
             self._trigger_quit_game_event(game, leaver)
 
             # Refund the participation cost if the game hasn't started yet
@@ -916,39 +1511,205 @@ class BattleBombRoyale(IconScoreBase):
 
         # ==========================
         # Update Game DB
-        self._update_game_db(game, token)
+        self._flush()
 
     @external(readonly=True)
     def get_gamestate(self, token: str) -> str:
+        self._reset_identity_map()
         try:
             self._check_game_already_exists(token)
         except GameDoesntExist:
             return ""
         return self._get_gamestate(token)
 
+    @external(readonly=True)
+    def get_gamestate_if_newer(self, token: str, version: int) -> str:
+        self._reset_identity_map()
+        try:
+            self._check_game_already_exists(token)
+        except GameDoesntExist:
+            return ""
+
+        game = self._get_gamestate_object(token)
+        if game.version <= version:
+            # Nothing changed since the client version
+            return json_dumps({'version': game.version})
+        return json_dumps(game.serialize_delta(version))
+
+    @external(readonly=True)
+    def get_gamestate_hash(self, token: str) -> str:
+        self._reset_identity_map()
+        try:
+            self._check_game_already_exists(token)
+        except GameDoesntExist:
+            return ""
+
+        digest = self._game_digests[token]
+        if digest is None:
+            # Game not written since digests are stored
+            digest = self._compute_game_digest(self._get_gamestate_object(token), token)
+        return digest.hex()
+
+    @external(readonly=True)
+    def get_game_events(self, token: str, offset: int, limit: int) -> str:
+        self._reset_identity_map()
+        try:
+            self._check_game_already_exists(token)
+        except GameDoesntExist:
+            # Events of the archived games can still be read
+            if not token in self._finished_games_tokens:
+                return ""
+
+        events = self._get_game_events(token)
+        start = max(offset, 0)
+        end = min(start + min(limit, self._MAXIMUM_PAGE_SIZE), len(events))
+        result = [events[index].hex() for index in range(start, end)]
+        return json_dumps(result)
+
+    @external(readonly=True)
+    def get_open_lobbies(self, cost: int, offset: int, limit: int) -> str:
+        self._reset_identity_map()
+        try:
+            self._check_allowed_participation_cost(cost)
+        except ForbiddenParticipationCost:
+            return ""
+
+        lobbies = self._get_open_lobbies(cost)
+        result = lobbies.slice(offset, min(limit, self._MAXIMUM_PAGE_SIZE))
+        return json_dumps(result)
+
+    @external(readonly=True)
+    def get_games_by_status(self, status: str, offset: int, limit: int) -> str:
+        self._reset_identity_map()
+        if not status in GameStatus.ALL:
+            return ""
+
+        games = self._get_games_by_status(status)
+        result = games.slice(offset, min(limit, self._MAXIMUM_PAGE_SIZE))
+        return json_dumps(result)
+
+    @external(readonly=True)
+    def get_finished_games(self, offset: int, limit: int) -> str:
+        self._reset_identity_map()
+        # The last finished games are returned first
+        count = self._finished_games_count.get()
+        start = max(offset, 0)
+        end = min(start + min(limit, self._MAXIMUM_PAGE_SIZE), min(count, self._FINISHED_GAMES_CAPACITY))
+        result = [json_loads(self._finished_games[(count - 1 - index) % self._FINISHED_GAMES_CAPACITY])
+                  for index in range(start, end)]
+        return json_dumps(result)
+
+    @external(readonly=True)
+    def get_player_history(self, address: str) -> str:
+        self._reset_identity_map()
+        return json_dumps(self._get_player_history(address))
+
     @external(readonly=True)
     def get_account(self, address: str) -> str:
+        self._reset_identity_map()
         try:
             self._check_account_exists(address)
         except AccountDoesntExist:
             return self._get_default_account(address).to_json()
         return self._get_account(address)
 
+    @external(readonly=True)
+    def get_leaderboard(self) -> str:
+        self._reset_identity_map()
+        # Accounts are read again, as their names may have changed
+        return json_dumps([json_loads(self._get_account(address)) for address, _ in self._get_leaderboard()])
+
     @external(readonly=True)
     def get_operator_fees(self) -> int:
+        self._reset_identity_map()
         return self._operator_fees.get()
 
+    @external(readonly=True)
+    def get_statistics(self) -> str:
+        self._reset_identity_map()
+        # Games not migrated yet aren't counted
+        return json_dumps({field: counter.get() for field, counter in self._statistics.items()})
+
     @external(readonly=True)
     def get_player_room(self, address: str) -> str:
+        self._reset_identity_map()
         try:
             self._check_player_registred(address)
         except PlayerIsNotRegistered:
             return ""
         return self._get_player_room(address)
 
+    @external(readonly=True)
+    def get_gamestates(self, tokens: str) -> str:
+        self._reset_identity_map()
+        result = {}
+        for token in self._split_batch(tokens):
+            try:
+                self._check_game_already_exists(token)
+            except GameDoesntExist:
+                result[token] = None
+                continue
+            result[token] = self._serialize_gamestate(token)
+        return json_dumps(result)
+
+    @external(readonly=True)
+    def get_accounts(self, addresses: str) -> str:
+        self._reset_identity_map()
+        result = {}
+        for address in self._split_batch(addresses):
+            try:
+                self._check_account_exists(address)
+            except AccountDoesntExist:
+                result[address] = self._get_default_account(address).serialize()
+                continue
+            result[address] = json_loads(self._get_account(address))
+        return json_dumps(result)
+
+    @external(readonly=True)
+    def get_player_rooms(self, addresses: str) -> str:
+        self._reset_identity_map()
+        result = {}
+        for address in self._split_batch(addresses):
+            try:
+                self._check_player_registred(address)
+            except PlayerIsNotRegistered:
+                result[address] = None
+                continue
+            result[address] = self._get_player_room(address)
+        return json_dumps(result)
+
+    @external(readonly=True)
+    def get_gamestates_page(self, cursor: int, limit: int) -> str:
+        self._reset_identity_map()
+        gamestates, next_cursor = self._get_games_page(cursor, limit, self._serialize_gamestate)
+        return json_dumps({
+            'gamestates': gamestates,
+            'next_cursor': next_cursor
+        })
+
+    @external(readonly=True)
+    def get_game_summary(self, token: str) -> str:
+        self._reset_identity_map()
+        try:
+            self._check_game_already_exists(token)
+        except GameDoesntExist:
+            return ""
+        return json_dumps(self._get_game_summary(token))
+
+    @external(readonly=True)
+    def get_game_summaries_page(self, cursor: int, limit: int) -> str:
+        self._reset_identity_map()
+        summaries, next_cursor = self._get_games_page(cursor, limit, self._get_game_summary)
+        return json_dumps({
+            'summaries': summaries,
+            'next_cursor': next_cursor
+        })
+
     @external(readonly=True)
     def get_all_gamestates(self) -> str:
-        result = list(map(self.get_gamestate, self._games))
+        self._reset_identity_map()
+        # Tokens inside the games list always exist
+        result = list(map(self._get_gamestate, self._games))
         return json_dumps(result)
 
     # =========================================
@@ -956,6 +1717,7 @@ class BattleBombRoyale(IconScoreBase):
     # =========================================
     @external(readonly=False)
     def reset_games(self) -> None:
+        self._reset_identity_map()
         # ==========================
         # Input Checks
         try:
@@ -965,14 +1727,17 @@ class BattleBombRoyale(IconScoreBase):
 
         # ==========================
         # Process GameState
-        for token in self._games:
-            self.reset_game(token)
-        # Cleanup references
-        while self._games:
-            self._games.pop()
+        # Games are removed from the games list when flushed
+        for token in list(self._games):
+            self._reset_game(token)
+
+        # ==========================
+        # Update Game DB
+        self._flush()
 
     @external(readonly=False)
     def reset_player(self, address: Address) -> None:
+        self._reset_identity_map()
         address = str(address)
 
         # ==========================
@@ -988,32 +1753,72 @@ class BattleBombRoyale(IconScoreBase):
         # ==========================
         # Process Player
         # ==========================
-        player = Player(address)
-        self._player_unregister_game(player, self._get_player_room(player.address))
+        self._player_unregister_game(address, self._get_player_room(address))
 
     @external(readonly=False)
     def reset_game(self, token: str) -> None:
+        self._reset_identity_map()
         # ==========================
         # Input Checks
         try:
             self._check_is_score_operator(self.msg.sender)
+            self._check_game_already_exists(token)
         except SenderNotScoreOwner:
             revert(self._SENDER_NOT_SCORE_OWNER)
+        except GameDoesntExist:
+            revert(self._GAME_DOESNT_EXIST)
 
         # ==========================
         # Process GameState
-        game = GameState.from_json(self._gamestates[token])
+        self._reset_game(token)
 
-        # Refund players
-        for player in game.get_all_players():
-            self._refund_participation_cost(game, player)
+        # ==========================
+        # Update Game DB
+        self._flush()
+
+    @external(readonly=False)
+    def migrate_games(self, limit: int) -> None:
+        self._reset_identity_map()
+        # ==========================
+        # Input Checks
+        try:
+            self._check_is_score_operator(self.msg.sender)
+        except SenderNotScoreOwner:
+            revert(self._SENDER_NOT_SCORE_OWNER)
 
-        # Clean memory
-        self._gamestate_cleanup(game, token)
-        self._game_destroy(token)
+        if not self._is_migrating():
+            return
+
+        # ==========================
+        # Process GameState
+        # Games are migrated from the tail of the games list : a destroyed game
+        # is replaced by the last game, which is always already migrated
+        cursor = min(self._migration_cursor.get(), len(self._games))
+        end = max(cursor - min(limit, self._MAXIMUM_MIGRATION_BATCH), 0)
+        for index in range(cursor - 1, end - 1, -1):
+            self._game_migrate(self._games[index], index)
+
+        self._migration_cursor.set(end)
+        if end == 0:
+            self._storage_version.set(self._LATEST_STORAGE_VERSION)
+
+        # ==========================
+        # Update Game DB
+        self._flush()
+
+    @external(readonly=True)
+    def get_migration_status(self) -> str:
+        self._reset_identity_map()
+        remaining = min(self._migration_cursor.get(), len(self._games)) if self._is_migrating() else 0
+        return json_dumps({
+            'storage_version' : self._storage_version.get(),
+            'latest_storage_version' : self._LATEST_STORAGE_VERSION,
+            'remaining' : remaining
+        })
 
     @external(readonly=False)
     def withdraw_operator_fees(self, address: Address, amount: int) -> None:
+        self._reset_identity_map()
         # ==========================
         # Input Checks
         try:
@@ -1,5 +1,6 @@
 from iconservice import *
 from ..bomb.bomb import *
+from ..codec.codec import *
 
 class PlayerHasNoBomb(Exception):
     pass
@@ -21,24 +22,39 @@ class PlayerState:
     ALIVE = 1
     LOOTABLE = 2
     DEAD = 3
+    ALL = [ALIVE, LOOTABLE, DEAD]
 
 class Player:
+    # Players are loaded by hundreds in a royale game, they don't need a __dict__
+    __slots__ = ['_address', '_flags', '_bomb', '_version', '_dirty']
 
     def __init__(self,
                  address: str,
                  state: int = PlayerState.ALIVE,
                  bomb: Bomb = None,
                  shield: bool = True,
-                 ready: bool = False):
+                 ready: bool = False,
+                 version: int = 0):
         self._address = address
-        self._state = state
+        # State, shield and ready are packed as in the binary layout
+        self._flags = state
+        if shield:
+            self._flags |= PlayerFlags.SHIELD
+        if ready:
+            self._flags |= PlayerFlags.READY
         self._bomb = bomb
-        self._shield = shield
-        self._ready = ready
+        # Version of the game when the player has been written for the last time
+        self._version = version
+        # Dirty is set if the player has been modified since it has been stored
+        self._dirty = False
 
     # ================================================
     #  Helpers
     # ================================================
+    def _set_state(self, state: int) -> None:
+        self._flags = (self._flags & ~PlayerFlags.STATE_MASK) | state
+        self._dirty = True
+
     def _is_afk(self, now: int) -> bool:
         if not self.is_alive():
             return False
@@ -56,25 +72,27 @@ class Player:
         # Player Checks
         self.check_lootable(now)
         # ==========================
-        self._state = PlayerState.DEAD
+        self._set_state(PlayerState.DEAD)
 
     def prepare_to_die(self) -> None:
         # ==========================
         # Player Checks
         self.check_alive()
         # ==========================
-        self._state = PlayerState.LOOTABLE
+        self._set_state(PlayerState.LOOTABLE)
 
     def use_shield(self) -> None:
         # ==========================
         # Player Checks
         self.check_has_shield()
         # ==========================
-        self._shield = False
+        self._flags &= ~PlayerFlags.SHIELD
+        self._dirty = True
 
     def remove_bomb(self) -> Bomb:
         bomb = self.get_bomb()
         self._bomb = None
+        self._dirty = True
         return bomb
 
     def get_bomb(self) -> Bomb:
@@ -83,38 +101,57 @@ class Player:
 
     def give_bomb(self, bomb: Bomb) -> None:
         self._bomb = bomb
+        self._dirty = True
 
     def is_alive(self) -> bool:
-        return self._state == PlayerState.ALIVE
+        return self.state == PlayerState.ALIVE
 
     def is_dead(self) -> bool:
-        return self._state == PlayerState.DEAD
+        return self.state == PlayerState.DEAD
 
     def is_lootable(self, now: int) -> bool:
-        return self._state == PlayerState.LOOTABLE or self._is_afk(now)
+        return self.state == PlayerState.LOOTABLE or self._is_afk(now)
 
     # def is_dead(self) -> bool:
     #     return self._state == PlayerState.DEAD
 
     def is_ready(self) -> bool:
-        return self._ready
+        return bool(self._flags & PlayerFlags.READY)
 
     def set_ready(self) -> None:
-        self._ready = True
+        self._flags |= PlayerFlags.READY
+        self._dirty = True
 
     def has_bomb(self) -> bool:
         return self._bomb is not None
 
     def has_shield(self) -> bool:
-        return self._shield
+        return bool(self._flags & PlayerFlags.SHIELD)
+
+    # Dirty tracking ==================
+    def set_dirty(self) -> None:
+        self._dirty = True
+
+    def is_dirty(self) -> bool:
+        return self._dirty or (self.has_bomb() and self._bomb.is_dirty())
+
+    def clear_dirty(self) -> None:
+        self._dirty = False
+        if self.has_bomb():
+            self._bomb.clear_dirty()
+
+    # Versioning ==================
+    def set_version(self, version: int) -> None:
+        self._version = version
 
     # Serialization ==================
     def serialize(self) -> dict:
         obj = {
             'address' : self._address,
-            'state' : self._state,
-            'shield' : self._shield,
-            'ready' : self._ready
+            'state' : self.state,
+            'shield' : self.has_shield(),
+            'ready' : self.is_ready(),
+            'version' : self._version
         }
 
         if self.has_bomb():
@@ -129,7 +166,45 @@ class Player:
             state=obj['state'],
             shield=obj['shield'],
             ready=obj['ready'],
-            bomb=Bomb.deserialize(obj['bomb']) if 'bomb' in obj else None
+            bomb=Bomb.deserialize(obj['bomb']) if 'bomb' in obj else None,
+            # Players written by a previous deployment have no version
+            version=obj.get('version', 0)
+        )
+
+    def to_json(self) -> str:
+        return json_dumps(self.serialize())
+
+    @staticmethod
+    def from_json(json: str) -> 'Player':
+        return Player.deserialize(json_loads(json))
+
+    def encode(self) -> bytes:
+        flags = self._flags
+        if self.has_bomb():
+            flags |= PlayerFlags.BOMB
+
+        writer = BinaryWriter()
+        writer.write_address(self._address)
+        writer.write_byte(flags)
+        if self.has_bomb():
+            self._bomb.write(writer)
+        writer.write_varint(self._version)
+        return writer.to_bytes()
+
+    @staticmethod
+    def decode(data: bytes) -> 'Player':
+        reader = BinaryReader(data)
+        address = reader.read_address()
+        flags = reader.read_byte()
+        bomb = Bomb.read(reader) if flags & PlayerFlags.BOMB else None
+        version = reader.read_varint()
+        return Player(
+            address=address,
+            state=flags & PlayerFlags.STATE_MASK,
+            shield=bool(flags & PlayerFlags.SHIELD),
+            ready=bool(flags & PlayerFlags.READY),
+            bomb=bomb,
+            version=version
         )
 
     # Checks ===========================
@@ -154,9 +229,18 @@ class Player:
     def address(self) -> str:
         return self._address
 
+    @property
+    def state(self) -> int:
+        return self._flags & PlayerFlags.STATE_MASK
+
+    @property
+    def version(self) -> int:
+        return self._version
+
     # Operators ==================
     def __hash__(self):
         return hash(self._address)
 
     def __eq__(self, other) -> bool:
-        return self._address == other.address
+        # A player is loaded once per game during a call, the same object is compared first
+        return self is other or self._address == other.address
@@ -0,0 +1,122 @@
+from iconservice import *
+from ..player.player import *
+from ..setdb.setdb import *
+
+class Roster:
+    """ Addresses of the players of a game, indexed by player state,
+        bomb ownership and readiness. Each index is an ordered set, kept
+        in memory for the games stored inside their header, or stored in
+        the state DB for the large games. No operation depends on the
+        players count, except the ones returning a list of addresses. """
+
+    def __init__(self, set_factory):
+        # set_factory is called with the name of each index
+        self._members = set_factory('members')
+        self._states = {state: set_factory('state_' + str(state)) for state in PlayerState.ALL}
+        self._bomb_holders = set_factory('bomb_holders')
+        # Receivers are the players who can receive a bomb : alive, without a bomb.
+        # Removing a receiver moves the last one in its place
+        self._receivers = set_factory('receivers')
+        self._not_ready = set_factory('not_ready')
+
+    @staticmethod
+    def in_memory() -> 'Roster':
+        return Roster(lambda name: MemorySet())
+
+    @staticmethod
+    def in_database(key: str, db: IconScoreDatabase) -> 'Roster':
+        return Roster(lambda name: SetDB(key + '_' + name, db))
+
+    # ================================================
+    #  Updates
+    # ================================================
+    def add(self, address: str, state: int, bomb: bool, ready: bool) -> None:
+        self._members.add(address)
+        self._states[state].add(address)
+        if bomb:
+            self._bomb_holders.add(address)
+        if not ready:
+            self._not_ready.add(address)
+        self._update_receiver(address)
+
+    def remove(self, address: str) -> None:
+        self._members.remove(address)
+        for addresses in self._states.values():
+            addresses.remove(address)
+        self._bomb_holders.remove(address)
+        self._receivers.remove(address)
+        self._not_ready.remove(address)
+
+    def set_state(self, address: str, state: int) -> None:
+        for current, addresses in self._states.items():
+            if current == state:
+                addresses.add(address)
+            else:
+                addresses.remove(address)
+        self._update_receiver(address)
+
+    def set_bomb(self, address: str, bomb: bool) -> None:
+        if bomb:
+            self._bomb_holders.add(address)
+        else:
+            self._bomb_holders.remove(address)
+        self._update_receiver(address)
+
+    def set_ready(self, address: str) -> None:
+        self._not_ready.remove(address)
+
+    def clear(self) -> None:
+        for addresses in [self._members, self._bomb_holders, self._receivers, self._not_ready]:
+            addresses.clear()
+        for addresses in self._states.values():
+            addresses.clear()
+
+    def _update_receiver(self, address: str) -> None:
+        if address in self._states[PlayerState.ALIVE] and not address in self._bomb_holders:
+            self._receivers.add(address)
+        else:
+            self._receivers.remove(address)
+
+    # ================================================
+    #  Queries
+    # ================================================
+    def count(self, state: int = None) -> int:
+        """ Count of the players with the given state, or of all the players """
+        return len(self._members if state is None else self._states[state])
+
+    def count_bomb_holders(self) -> int:
+        return len(self._bomb_holders)
+
+    def get_member(self, position: int) -> str:
+        return self._members.get(position)
+
+    def get_first(self, state: int) -> str:
+        return self._states[state].get(0)
+
+    def get_addresses(self, state: int = None) -> list:
+        """ Addresses of the players with the given state, or of all the players """
+        return list(self._members if state is None else self._states[state])
+
+    def get_bomb_holders(self) -> list:
+        return list(self._bomb_holders)
+
+    def get_not_ready(self) -> list:
+        return list(self._not_ready)
+
+    def get_receivers(self):
+        """ Ordered set of the receivers, to be sampled without being copied """
+        return self._receivers
+
+    def get_state(self, address: str) -> int:
+        for state, addresses in self._states.items():
+            if address in addresses:
+                return state
+
+    def has_bomb(self, address: str) -> bool:
+        return address in self._bomb_holders
+
+    def is_ready(self, address: str) -> bool:
+        return not address in self._not_ready
+
+    def __contains__(self, address: str) -> bool:
+        return address in self._members
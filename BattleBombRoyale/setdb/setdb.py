@@ -0,0 +1,98 @@
+from iconservice import *
+
+class SetDB:
+    """ Iterable set of strings stored in the state DB.
+        Items are stored in an ArrayDB and their position in a DictDB, so adding,
+        removing or looking for an item doesn't depend on the set size.
+        Removing an item moves the last item in its place. """
+
+    def __init__(self, key: str, db: IconScoreDatabase):
+        self._items = ArrayDB(key, db, value_type=str)
+        self._positions = DictDB(key + '_positions', db, value_type=int)
+
+    def add(self, item: str) -> None:
+        if item in self:
+            return
+        self._positions[item] = len(self._items)
+        self._items.put(item)
+
+    def remove(self, item: str) -> None:
+        if not item in self:
+            return
+        position = self._positions[item]
+        last = self._items.pop()
+        if last != item:
+            self._items[position] = last
+            self._positions[last] = position
+        self._positions.remove(item)
+
+    def get(self, position: int) -> str:
+        return self._items[position]
+
+    def index(self, item: str) -> int:
+        """ Must check that the item is in the set before """
+        return self._positions[item]
+
+    def slice(self, offset: int, limit: int) -> list:
+        start = max(offset, 0)
+        end = min(start + limit, len(self))
+        return [self._items[position] for position in range(start, end)]
+
+    def clear(self) -> None:
+        while self._items:
+            self._positions.remove(self._items.pop())
+
+    def __contains__(self, item: str) -> bool:
+        return item in self._positions
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+class MemorySet:
+    """ Same interface as SetDB, for a set kept in memory """
+
+    def __init__(self):
+        self._items = []
+        self._positions = {}
+
+    def add(self, item: str) -> None:
+        if item in self:
+            return
+        self._positions[item] = len(self._items)
+        self._items.append(item)
+
+    def remove(self, item: str) -> None:
+        if not item in self:
+            return
+        position = self._positions.pop(item)
+        last = self._items.pop()
+        if last != item:
+            self._items[position] = last
+            self._positions[last] = position
+
+    def get(self, position: int) -> str:
+        return self._items[position]
+
+    def index(self, item: str) -> int:
+        """ Must check that the item is in the set before """
+        return self._positions[item]
+
+    def slice(self, offset: int, limit: int) -> list:
+        start = max(offset, 0)
+        return self._items[start:start + limit]
+
+    def clear(self) -> None:
+        self._items = []
+        self._positions = {}
+
+    def __contains__(self, item: str) -> bool:
+        return item in self._positions
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
@@ -0,0 +1,139 @@
+import unittest
+
+from BattleBombRoyale.codec.codec import *
+from BattleBombRoyale.bomb.bomb import *
+from BattleBombRoyale.player.player import *
+from BattleBombRoyale.gamestate.gamestate import *
+
+class TestCodec(unittest.TestCase):
+
+    _HOST = 'hx' + '01' * 20
+    _PLAYER = 'hx' + '02' * 20
+    _SCORE = 'cx' + '03' * 20
+    _TOKEN = 'ab' * 32
+
+    def read(self, data: bytes) -> BinaryReader:
+        return BinaryReader(data)
+
+    # ===============================================================
+    def test_codec_varint(self):
+        for value, size in [(0, 1), (127, 1), (128, 2), (16383, 2), (16384, 3), (10**18, 9), (2**64, 10)]:
+            writer = BinaryWriter()
+            writer.write_varint(value)
+            data = writer.to_bytes()
+            # The version byte comes first
+            self.assertEqual(len(data), 1 + size)
+            self.assertEqual(self.read(data).read_varint(), value)
+
+    def test_codec_varint_negative(self):
+        writer = BinaryWriter()
+        self.assertRaises(InvalidEncoding, writer.write_varint, -1)
+
+    def test_codec_address(self):
+        writer = BinaryWriter()
+        writer.write_address(self._HOST)
+        writer.write_address(self._SCORE)
+        data = writer.to_bytes()
+        self.assertEqual(len(data), 1 + 2 * 21)
+        # The prefix is stored as the first byte of the address
+        self.assertEqual(data[1], 0)
+        self.assertEqual(data[22], 1)
+
+        reader = self.read(data)
+        self.assertEqual(reader.read_address(), self._HOST)
+        self.assertEqual(reader.read_address(), self._SCORE)
+
+    def test_codec_address_invalid(self):
+        writer = BinaryWriter()
+        self.assertRaises(InvalidEncoding, writer.write_address, 'xx' + '01' * 20)
+        self.assertRaises(InvalidEncoding, writer.write_address, 'hx' + '01' * 19)
+
+        # Unknown prefix byte
+        self.assertRaises(InvalidEncoding, self.read(bytes([Codec.VERSION, 2]) + bytes(20)).read_address)
+
+    def test_codec_hash(self):
+        writer = BinaryWriter()
+        writer.write_hash(self._TOKEN)
+        self.assertEqual(self.read(writer.to_bytes()).read_hash(), self._TOKEN)
+        self.assertRaises(InvalidEncoding, writer.write_hash, 'ab' * 31)
+
+    def test_codec_truncated(self):
+        writer = BinaryWriter()
+        writer.write_varint(300)
+        writer.write_address(self._HOST)
+        data = writer.to_bytes()
+
+        # Address cut
+        reader = self.read(data[:-1])
+        reader.read_varint()
+        self.assertRaises(InvalidEncoding, reader.read_address)
+
+        # Varint cut after a byte announcing another one
+        self.assertRaises(InvalidEncoding, self.read(data[:2]).read_varint)
+
+        # No version byte
+        self.assertRaises(InvalidEncoding, self.read, b'')
+
+    def test_codec_version(self):
+        self.assertRaises(UnsupportedCodecVersion, self.read, bytes([0]))
+        self.assertRaises(UnsupportedCodecVersion, self.read, bytes([Codec.VERSION + 1]))
+        self.assertEqual(self.read(bytes([Codec.VERSION])).version, Codec.VERSION)
+
+    def test_codec_outdated(self):
+        self.assertTrue(Codec.is_json(b'{"token": ""}'))
+        self.assertTrue(Codec.is_outdated(b'{"token": ""}'))
+        self.assertFalse(Codec.is_outdated(BinaryWriter().to_bytes()))
+
+    def test_codec_player(self):
+        players = [
+            Player(self._HOST),
+            Player(self._PLAYER, state=PlayerState.LOOTABLE, shield=False, ready=True, version=300),
+            Player(self._SCORE, bomb=Bomb(10**12, 25), ready=True, version=1)
+        ]
+        for player in players:
+            decoded = Player.decode(player.encode())
+            self.assertEqual(decoded.serialize(), player.serialize())
+
+    def test_codec_player_invalid(self):
+        data = Player(self._HOST, bomb=Bomb(10**12)).encode()
+        self.assertRaises(InvalidEncoding, Player.decode, data[:-1])
+        self.assertRaises(UnsupportedCodecVersion, Player.decode, bytes([Codec.VERSION + 1]) + data[1:])
+
+    def test_codec_header(self):
+        game = GameState(self._TOKEN, 10**18, self._HOST, 10**15)
+        game.join(Player(self._HOST, ready=True))
+        game.join(Player(self._PLAYER, bomb=Bomb(10**15)))
+        game.join(Player(self._SCORE, state=PlayerState.DEAD, shield=False))
+
+        header = GameState.decode_header(game.encode_header())
+        self.assertEqual(header['token'], self._TOKEN)
+        self.assertEqual(header['cost'], 10**18)
+        self.assertEqual(header['host'], self._HOST)
+        self.assertEqual(header['created'], 10**15)
+        self.assertEqual(header['roster'], [self._HOST, self._PLAYER, self._SCORE])
+        self.assertEqual(header['states'], [PlayerState.ALIVE, PlayerState.ALIVE, PlayerState.DEAD])
+        self.assertEqual(header['bomb_holders'], [self._PLAYER])
+        self.assertEqual(header['ready'], [self._HOST])
+
+        decoded = GameState.deserialize_header(header, lambda address: None)
+        self.assertEqual(decoded.encode_header(), game.encode_header())
+
+    def test_codec_header_royale(self):
+        game = GameState(self._TOKEN, 10**18, self._HOST, 10**15,
+                         max_players=100, bombs=5, roster=Roster.in_memory())
+        game.join(Player(self._HOST))
+        game.join(Player(self._PLAYER))
+
+        # The roster of a royale game isn't stored in its header
+        header = GameState.decode_header(game.encode_header())
+        self.assertEqual(header['players_count'], 2)
+        self.assertEqual(header['max_players'], 100)
+        self.assertEqual(header['bombs'], 5)
+        self.assertFalse('roster' in header)
+
+    def test_codec_header_invalid(self):
+        game = GameState(self._TOKEN, 10**18, self._HOST, 10**15)
+        game.join(Player(self._HOST))
+        data = game.encode_header()
+        self.assertRaises(InvalidEncoding, GameState.decode_header, data[:-2])
+        self.assertRaises(UnsupportedCodecVersion, GameState.decode_header, bytes([0]) + data[1:])
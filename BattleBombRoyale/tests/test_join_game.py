@@ -1,4 +1,4 @@
-import os
+import os, json
 
 from iconsdk.builder.transaction_builder import DeployTransactionBuilder
 from iconsdk.builder.call_builder import CallBuilder
@@ -83,6 +83,37 @@ class TestBattleBombRoyale(IconIntegrateTestBase):
             value=self._PARTICIPATION_COST
         )
 
+    def test_join_game_written(self):
+        # OK
+        transaction_call_success(super(),
+            from_=self._j2,
+            to_=self._score_address,
+            method="join_game",
+            params={'token' : self._token},
+            icon_service=self.icon_service,
+            value=self._PARTICIPATION_COST
+        )
+
+        # The game and everything derived from it are written when the call is flushed
+        gamestate = json.loads(icx_call(super(),
+            from_=self._j1.get_address(),
+            to_=self._score_address,
+            method="get_gamestate",
+            params={'token': self._token},
+            icon_service=self.icon_service,
+        ))
+        self.assertEqual(len(gamestate['players']), 2)
+        self.assertEqual(gamestate['reward'], 2 * self._PARTICIPATION_COST)
+
+        statistics = json.loads(icx_call(super(),
+            from_=self._j1.get_address(),
+            to_=self._score_address,
+            method="get_statistics",
+            icon_service=self.icon_service,
+        ))
+        self.assertEqual(statistics['players'], 2)
+        self.assertEqual(statistics['escrow'], 2 * self._PARTICIPATION_COST)
+
     def test_join_game_INVALID_PARTICIPATION_COST(self):
         # Fail
         result = transaction_call_error(super(), 
@@ -1,4 +1,4 @@
-import os
+import os, json
 
 from iconsdk.builder.transaction_builder import DeployTransactionBuilder
 from iconsdk.builder.call_builder import CallBuilder
@@ -15,6 +15,8 @@ DIR_PATH = os.path.abspath(os.path.dirname(__file__))
 class TestBattleBombRoyale(IconIntegrateTestBase):
     TEST_HTTP_ENDPOINT_URI_V3 = "http://127.0.0.1:9000/api/v3"
     SCORE_PROJECT= os.path.abspath(os.path.join(DIR_PATH, '..'))
+    # SCORE of the first deployment, storing the games with the JSON layout
+    SCORE_BASELINE_PROJECT = os.path.abspath(os.path.join(DIR_PATH, 'score_baseline'))
 
     _PARTICIPATION_COST = 1 * 10**18
 
@@ -28,7 +30,20 @@ class TestBattleBombRoyale(IconIntegrateTestBase):
         # install SCORE
         self._score_address = self._deploy_score()['scoreAddress']
 
-    def _deploy_score(self, to: str = SCORE_INSTALL_ADDRESS) -> dict:
+    def call(self, method, params=None):
+        result = icx_call(super(),
+            from_=self._test1.get_address(),
+            to_=self._score_address,
+            method=method,
+            params=params,
+            icon_service=self.icon_service
+        )
+        return json.loads(result)
+
+    def get_migration_status(self):
+        return self.call("get_migration_status")
+
+    def _deploy_score(self, to: str = SCORE_INSTALL_ADDRESS, project: str = SCORE_PROJECT) -> dict:
         # Generates an instance of transaction for deploying SCORE.
         transaction = DeployTransactionBuilder() \
             .from_(self._test1.get_address()) \
@@ -37,7 +52,7 @@ class TestBattleBombRoyale(IconIntegrateTestBase):
             .nid(3) \
             .nonce(100) \
             .content_type("application/zip") \
-            .content(gen_deploy_data_content(self.SCORE_PROJECT)) \
+            .content(gen_deploy_data_content(project)) \
             .build()
 
         # Returns the signed transaction object having a signature
@@ -55,4 +70,90 @@ class TestBattleBombRoyale(IconIntegrateTestBase):
     def test_score_update(self):
         # update SCORE
         result = self._deploy_score(self._score_address)
-        self.assertEqual(self._score_address, result['scoreAddress'])
\ No newline at end of file
+        self.assertEqual(self._score_address, result['scoreAddress'])
+
+    def test_score_update_migration(self):
+        # Games stored by the baseline deployment
+        self._score_address = self._deploy_score(project=self.SCORE_BASELINE_PROJECT)['scoreAddress']
+        wallets = self._wallet_array
+        for wallet in wallets:
+            icx_transfer_call(super(), self._test1, wallet.get_address(), 100 * 10**18, self.icon_service)
+
+        tokens = []
+        for host, player in [(wallets[0], wallets[1]), (wallets[2], wallets[3]), (wallets[4], wallets[5])]:
+            # OK
+            result = transaction_call_success(super(),
+                from_=host,
+                to_=self._score_address,
+                method="create_game",
+                icon_service=self.icon_service,
+                value=self._PARTICIPATION_COST
+            )
+            tokens.append(result['txHash'])
+            # OK
+            transaction_call_success(super(),
+                from_=player,
+                to_=self._score_address,
+                method="join_game",
+                params={'token': tokens[-1]},
+                icon_service=self.icon_service,
+                value=self._PARTICIPATION_COST
+            )
+
+        # Start the first game, the others stay in the lobby
+        for wallet, method in [(wallets[0], "ready_ask"), (wallets[1], "ready_ok"), (wallets[0], "start_game")]:
+            # OK
+            transaction_call_success(super(),
+                from_=wallet,
+                to_=self._score_address,
+                method=method,
+                icon_service=self.icon_service
+            )
+
+        # update SCORE
+        result = self._deploy_score(self._score_address)
+        self.assertEqual(self.get_migration_status()['remaining'], 3)
+
+        # Games are migrated by batches, the cursor moves forward after each one
+        for remaining in [2, 1, 0]:
+            # OK
+            transaction_call_success(super(),
+                from_=self._test1,
+                to_=self._score_address,
+                method="migrate_games",
+                params={'limit': 1},
+                icon_service=self.icon_service
+            )
+            status = self.get_migration_status()
+            self.assertEqual(status['remaining'], remaining)
+            if remaining:
+                self.assertTrue(status['storage_version'] < status['latest_storage_version'])
+
+        status = self.get_migration_status()
+        self.assertEqual(status['storage_version'], status['latest_storage_version'])
+
+        # Indexes match the migrated games
+        self.assertEqual(self.call("get_statistics"), {
+            'games': 3,
+            'lobbies': 2,
+            'players': 6,
+            'escrow': 6 * self._PARTICIPATION_COST
+        })
+        lobbies = self.call("get_open_lobbies", {'cost': self._PARTICIPATION_COST, 'offset': 0, 'limit': 10})
+        self.assertEqual(sorted(lobbies), sorted(tokens[1:]))
+        self.assertEqual(sorted(self.call("get_games_by_status", {'status': 'lobby', 'offset': 0, 'limit': 10})), sorted(tokens[1:]))
+        self.assertEqual(self.call("get_games_by_status", {'status': 'running', 'offset': 0, 'limit': 10}), tokens[:1])
+        page = self.call("get_gamestates_page", {'cursor': 0, 'limit': 10})
+        self.assertEqual(sorted(gamestate['token'] for gamestate in page['gamestates']), sorted(tokens))
+        self.assertEqual(page['next_cursor'], None)
+
+    def test_migrate_games_SENDER_NOT_SCORE_OWNER(self):
+        # Fail
+        result = transaction_call_error(super(),
+            from_=self._wallet_array[0],
+            to_=self._score_address,
+            method="migrate_games",
+            params={'limit': 100},
+            icon_service=self.icon_service
+        )
+        self.assertEqual(result['failure']['message'], 'SENDER_NOT_SCORE_OWNER')
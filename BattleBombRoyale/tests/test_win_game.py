@@ -184,6 +184,61 @@ class TestBattleBombRoyale(IconIntegrateTestBase):
         new_balance = self.get_balance(self._players_no_bomb[0])
         self.assertTrue(new_balance > old_balance)
 
+    def test_win_game_leaderboard(self):
+        self.set_ready()
+        self.start_game()
+        self.wait_and_loot()
+
+        # OK
+        result = transaction_call_success(super(),
+            from_=self._wallets_no_bomb[0],
+            to_=self._score_address,
+            method="win_game",
+            icon_service=self.icon_service
+        )
+
+        # Check winner account
+        result = icx_call(super(),
+            from_=self._j1.get_address(),
+            to_=self._score_address,
+            method="get_leaderboard",
+            icon_service=self.icon_service,
+        )
+        leaderboard = json.loads(result)
+        self.assertEqual(leaderboard[0]['address'], self._players_no_bomb[0].address)
+        self.assertEqual(leaderboard[0]['games_played'], 1)
+        self.assertEqual(leaderboard[0]['wins'], 1)
+        self.assertEqual(leaderboard[0]['loots'], 1)
+        self.assertTrue(leaderboard[0]['icx_won'] > 0)
+
+    def test_win_game_finished_games(self):
+        self.set_ready()
+        self.start_game()
+        self.wait_and_loot()
+
+        # OK
+        result = transaction_call_success(super(),
+            from_=self._wallets_no_bomb[0],
+            to_=self._score_address,
+            method="win_game",
+            icon_service=self.icon_service
+        )
+
+        # Check archived result
+        result = icx_call(super(),
+            from_=self._j1.get_address(),
+            to_=self._score_address,
+            method="get_finished_games",
+            params={'offset': 0, 'limit': 10},
+            icon_service=self.icon_service,
+        )
+        finished = json.loads(result)
+        self.assertEqual(len(finished), 1)
+        self.assertEqual(finished[0]['token'], self._token)
+        self.assertEqual(finished[0]['winner'], self._players_no_bomb[0].address)
+        self.assertEqual(finished[0]['cost'], self._PARTICIPATION_COST)
+        self.assertTrue(finished[0]['reward'] > 0)
+
     def test_win_game_METHOD_NOT_PAYABLE(self):
         self.set_ready()
         self.start_game()
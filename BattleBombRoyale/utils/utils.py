@@ -68,3 +68,7 @@ class Utils:
     @staticmethod
     def is_ascii(string):
         return all(ord(c) < 127 and ord(c) > 32 for c in string)
+
+    @staticmethod
+    def xor_bytes(a: bytes, b: bytes) -> bytes:
+        return bytes(x ^ y for x, y in zip(a, b))
@@ -0,0 +1,9 @@
+import json
+import sys
+
+if __name__ == '__main__':
+    call = json.loads(open("./calls/create_royale_game.json", "rb").read())
+    call["params"]["to"] = open("./config/score_address.txt", "r").read()
+    call["params"]["data"]["params"]["max_players"] = hex(int(sys.argv[1]))
+    call["params"]["data"]["params"]["bombs"] = hex(int(sys.argv[2]))
+    print(json.dumps(call))
@@ -0,0 +1,9 @@
+#!/bin/bash
+
+player=${1}
+max_players=${2}
+bombs=${3}
+txhash=`tbears sendtx <(python ./scripts/create_royale_game.py ${max_players} ${bombs}) -k ./keystores/j${player}.icx -c ./config/tbears_cli_config_local.json | grep 0x | cut -d' ' -f 3`
+echo "Player ${player} : Create Royale Game txhash = ${txhash}"
+sleep 2
+tbears txresult ${txhash}
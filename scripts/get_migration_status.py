@@ -0,0 +1,7 @@
+import json
+import sys
+
+if __name__ == '__main__':
+    call = json.loads(open("./calls/get_migration_status.json", "rb").read())
+    call["params"]["to"] = open("./config/score_address.txt", "r").read()
+    print(json.dumps(call))
\ No newline at end of file
@@ -0,0 +1,3 @@
+#!/bin/bash
+
+tbears call <(python ./scripts/get_migration_status.py) -c ./config/tbears_cli_config_local.json
\ No newline at end of file
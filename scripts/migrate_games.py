@@ -0,0 +1,8 @@
+import json
+import sys
+
+if __name__ == '__main__':
+    call = json.loads(open("./calls/migrate_games.json", "rb").read())
+    call["params"]["to"] = open("./config/score_address.txt", "r").read()
+    call["params"]["data"]["params"]["limit"] = hex(int(sys.argv[1]))
+    print(json.dumps(call))
\ No newline at end of file
@@ -0,0 +1,7 @@
+#!/bin/bash
+
+limit=${1}
+txhash=`tbears sendtx <(python ./scripts/migrate_games.py ${limit}) -k ./keystores/gamemaster.icx -c ./config/tbears_cli_config_local.json | grep 0x | cut -d' ' -f 3`
+echo "Migrate Games txhash = ${txhash}"
+sleep 2
+tbears txresult ${txhash}